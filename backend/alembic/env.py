@@ -7,6 +7,7 @@ from alembic import context
 
 from app.models.user import User
 from app.database.connection import Base
+from app.database.settings import settings
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -17,6 +18,10 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Адрес БД берётся из тех же настроек, что и у приложения (DATABASE_URL, DB_PASSWORD),
+# а не из alembic.ini. "%" экранируется для configparser
+config.set_main_option("sqlalchemy.url", settings.sync_url.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
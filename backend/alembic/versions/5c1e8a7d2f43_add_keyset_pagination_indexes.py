@@ -0,0 +1,38 @@
+"""add keyset pagination indexes
+
+Revision ID: 5c1e8a7d2f43
+Revises: 3721a1669dc8
+Create Date: 2026-10-18 12:05:41.218903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e8a7d2f43'
+down_revision: Union[str, None] = '3721a1669dc8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Сортировка (created_at DESC, id DESC) для списка рецептов и рецептов автора
+    op.create_index('ix_recipes_created_at_id', 'recipes', ['created_at', 'id'])
+    op.create_index('ix_recipes_author_id_created_at_id', 'recipes', ['author_id', 'created_at', 'id'])
+    # Сортировка избранного пользователя по времени добавления
+    op.create_index(
+        'ix_favorite_recipes_user_id_created_at_recipe_id',
+        'favorite_recipes',
+        ['user_id', 'created_at', 'recipe_id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_favorite_recipes_user_id_created_at_recipe_id', table_name='favorite_recipes')
+    op.drop_index('ix_recipes_author_id_created_at_id', table_name='recipes')
+    op.drop_index('ix_recipes_created_at_id', table_name='recipes')
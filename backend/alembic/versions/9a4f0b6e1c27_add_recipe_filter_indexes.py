@@ -0,0 +1,56 @@
+"""add recipe filter indexes
+
+Revision ID: 9a4f0b6e1c27
+Revises: 5c1e8a7d2f43
+Create Date: 2026-10-18 13:52:10.604417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f0b6e1c27'
+down_revision: Union[str, None] = '5c1e8a7d2f43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Теги и ингредиенты теперь хранятся в нижнем регистре без пробелов по краям,
+    # без пустых значений и повторов (порядок — по первому вхождению, как у
+    # normalize_terms), чтобы фильтры сравнивали значения напрямую и могли
+    # использовать GIN-индексы
+    op.execute(
+        """
+        UPDATE recipes SET
+            tags = ARRAY(
+                SELECT term FROM unnest(tags) WITH ORDINALITY AS u(t, ord), lower(btrim(t)) AS term
+                WHERE term <> '' GROUP BY term ORDER BY min(ord)
+            ),
+            ingredients = ARRAY(
+                SELECT term FROM unnest(ingredients) WITH ORDINALITY AS u(i, ord), lower(btrim(i)) AS term
+                WHERE term <> '' GROUP BY term ORDER BY min(ord)
+            )
+        """
+    )
+    op.create_index('ix_recipes_tags_gin', 'recipes', ['tags'], postgresql_using='gin')
+    op.create_index('ix_recipes_ingredients_gin', 'recipes', ['ingredients'], postgresql_using='gin')
+    op.create_index('ix_recipes_cooking_time_minutes', 'recipes', ['cooking_time_minutes'])
+    op.create_index(
+        'ix_recipes_difficulty_cooking_time_minutes',
+        'recipes',
+        ['difficulty', 'cooking_time_minutes'],
+    )
+    # author_id покрыт ведущим столбцом ix_recipes_author_id_created_at_id
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recipes_difficulty_cooking_time_minutes', table_name='recipes')
+    op.drop_index('ix_recipes_cooking_time_minutes', table_name='recipes')
+    op.drop_index('ix_recipes_ingredients_gin', table_name='recipes')
+    op.drop_index('ix_recipes_tags_gin', table_name='recipes')
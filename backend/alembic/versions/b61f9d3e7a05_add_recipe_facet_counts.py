@@ -0,0 +1,54 @@
+"""add recipe facet counts
+
+Revision ID: b61f9d3e7a05
+Revises: e8b5c2a94d16
+Create Date: 2026-10-18 16:10:42.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b61f9d3e7a05'
+down_revision: Union[str, None] = 'e8b5c2a94d16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'recipe_facet_counts',
+        sa.Column('facet', sa.String(length=20), nullable=False),
+        sa.Column('value', sa.String(), nullable=False),
+        sa.Column('recipes_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('facet', 'value'),
+    )
+    # Начальное заполнение по существующим рецептам (диапазоны как в app/facets.py)
+    op.execute("""
+        INSERT INTO recipe_facet_counts (facet, value, recipes_count)
+        SELECT 'total', '', count(*) FROM recipes
+        UNION ALL
+        SELECT 'tag', tag, count(DISTINCT id) FROM recipes, unnest(tags) AS tag GROUP BY tag
+        UNION ALL
+        SELECT 'difficulty', difficulty::varchar, count(*) FROM recipes GROUP BY difficulty
+        UNION ALL
+        SELECT 'cooking_time', bucket, count(*) FROM (
+            SELECT CASE
+                WHEN cooking_time_minutes <= 15 THEN '0-15'
+                WHEN cooking_time_minutes <= 30 THEN '16-30'
+                WHEN cooking_time_minutes <= 60 THEN '31-60'
+                WHEN cooking_time_minutes <= 120 THEN '61-120'
+                ELSE '121+'
+            END AS bucket
+            FROM recipes
+        ) AS buckets GROUP BY bucket
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('recipe_facet_counts')
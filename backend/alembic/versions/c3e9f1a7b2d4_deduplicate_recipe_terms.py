@@ -0,0 +1,53 @@
+"""deduplicate recipe terms
+
+Revision ID: c3e9f1a7b2d4
+Revises: b61f9d3e7a05
+Create Date: 2026-10-18 19:24:37.118052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e9f1a7b2d4'
+down_revision: Union[str, None] = 'b61f9d3e7a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def normalized(column: str) -> str:
+    # Нижний регистр, без пробелов по краям, без пустых и повторов;
+    # порядок — по первому вхождению, как у normalize_terms
+    return f"""ARRAY(
+        SELECT term FROM unnest({column}) WITH ORDINALITY AS u(value, ord), lower(btrim(value)) AS term
+        WHERE term <> '' GROUP BY term ORDER BY min(ord)
+    )"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Базы, где 9a4f0b6e1c27 уже выполнилась, пока она оставляла пустые теги и повторы.
+    # Переписываются только строки, которые меняются
+    op.execute(f"""
+        UPDATE recipes AS r SET tags = n.tags, ingredients = n.ingredients
+        FROM (
+            SELECT id, {normalized('tags')} AS tags, {normalized('ingredients')} AS ingredients
+            FROM recipes
+        ) AS n
+        WHERE r.id = n.id AND (r.tags <> n.tags OR r.ingredients <> n.ingredients)
+    """)
+    # Счётчики тегов пересчитываются заново: пустой тег из них тоже уходит
+    op.execute("DELETE FROM recipe_facet_counts WHERE facet = 'tag'")
+    op.execute("""
+        INSERT INTO recipe_facet_counts (facet, value, recipes_count)
+        SELECT 'tag', tag, count(*) FROM recipes, unnest(tags) AS tag GROUP BY tag
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Удалённые повторы и пустые значения не восстановить, да и не нужно
+    pass
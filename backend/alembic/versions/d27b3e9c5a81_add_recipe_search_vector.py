@@ -0,0 +1,45 @@
+"""add recipe search vector
+
+Revision ID: d27b3e9c5a81
+Revises: 9a4f0b6e1c27
+Create Date: 2026-10-18 14:20:37.915246
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd27b3e9c5a81'
+down_revision: Union[str, None] = '9a4f0b6e1c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Копия выражения из app/models/recipe.py на момент миграции
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(steps, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'recipes',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        ),
+    )
+    op.create_index('ix_recipes_search_vector_gin', 'recipes', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recipes_search_vector_gin', table_name='recipes')
+    op.drop_column('recipes', 'search_vector')
@@ -0,0 +1,31 @@
+"""add image variants
+
+Revision ID: e8b5c2a94d16
+Revises: d27b3e9c5a81
+Create Date: 2026-10-18 15:02:58.331870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b5c2a94d16'
+down_revision: Union[str, None] = 'd27b3e9c5a81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('recipes', sa.Column('image_variants', postgresql.JSONB(), nullable=True))
+    op.add_column('users', sa.Column('profile_picture_variants', postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'profile_picture_variants')
+    op.drop_column('recipes', 'image_variants')
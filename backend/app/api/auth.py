@@ -1,11 +1,19 @@
 from app.database.connection import get_db
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
+import asyncio
+import os
+import time
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import DateTime, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
+from app.cache import Cache, MemoryBackend, create_backend, current_user_key
+from sqlalchemy.orm import make_transient_to_detached
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
+import orjson
 from jwt.exceptions import InvalidTokenError
 from passlib.context import CryptContext
 
@@ -15,6 +23,23 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# Для публичных эндпоинтов, которые дополняют ответ данными пользователя, если он вошёл
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+
+# Ограничения для пула хеширования паролей
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "2.0"))
+PASSWORD_HASH_USE_PROCESSES = os.getenv("PASSWORD_HASH_USE_PROCESSES", "0") == "1"
+
+# Короткоживущий кеш пользователей, найденных по токену (ключ — id из claim "uid").
+# Хранилище то же, что у кеша ответов (CACHE_BACKEND): с redis сброс после изменения
+# пользователя виден всем воркерам сразу, с кешем в памяти — только своему, остальным через TTL
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+current_user_cache = Cache(create_backend(ttl=AUTH_CACHE_TTL_SECONDS, max_entries=AUTH_CACHE_MAX_ENTRIES))
+# Разобранные записи этого кеша в памяти воркера: пока в кеше те же байты,
+# объект пользователя не создаётся заново на каждый запрос
+decoded_users = MemoryBackend(max_entries=AUTH_CACHE_MAX_ENTRIES, ttl=AUTH_CACHE_TTL_SECONDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -23,6 +48,95 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+
+class PasswordHasher:
+    """
+    Выполняет bcrypt вне цикла событий с ограниченной параллельностью.
+
+    Каждый вызов bcrypt — это ~200 мс CPU. Вызовы уходят в отдельный пул
+    потоков (или процессов), одновременно выполняется не больше max_workers,
+    остальные ждут в очереди не дольше queue_timeout, после чего получают 503.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = PASSWORD_HASH_WORKERS,
+        queue_timeout: float = PASSWORD_HASH_QUEUE_TIMEOUT,
+        use_processes: bool = PASSWORD_HASH_USE_PROCESSES,
+    ):
+        self.max_workers = max_workers
+        self.queue_timeout = queue_timeout
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, func, *args):
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.running -= 1
+            self.completed += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "executor": "process" if self.use_processes else "thread",
+            "max_workers": self.max_workers,
+            "queue_depth": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_latency_ms": self.total_seconds / self.completed * 1000 if self.completed else 0.0,
+            "max_latency_ms": self.max_seconds * 1000,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -33,9 +147,42 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+
+# Хеш пароля в общий кеш не попадает: у объекта из кеша он не загружен,
+# вход и смена пароля читают пользователя из БД
+CACHED_USER_COLUMNS = [column for column in User.__table__.columns if column.key != "password_hash"]
+
+
+def _serialize_user(user: User) -> bytes:
+    """
+    Значения столбцов пользователя (кроме хеша пароля) в JSON — для хранения в кеше.
+    """
+    return orjson.dumps({column.key: getattr(user, column.key) for column in CACHED_USER_COLUMNS})
+
+
+def _deserialize_user(data: bytes) -> User:
+    """
+    Пользователь из кеша, не привязанный ни к одной сессии.
+    """
+    values = orjson.loads(data)
+    for column in CACHED_USER_COLUMNS:
+        if isinstance(column.type, DateTime) and values[column.key] is not None:
+            values[column.key] = datetime.fromisoformat(values[column.key])
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+async def invalidate_current_user(user_id: int) -> None:
+    """
+    Сбрасывает закешированного пользователя после изменения или удаления.
+    """
+    await current_user_cache.invalidate(current_user_key(user_id))
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     Получает текущего аутентифицированного пользователя по JWT токену.
@@ -49,17 +196,48 @@ async def get_current_user(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
+        user_id: Optional[int] = payload.get("uid")
         if not username:
             raise credentials_exception
     except InvalidTokenError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
+    if user_id is None:
+        # Токены, выданные до появления claim "uid"
+        user = await db.scalar(select(User).where(User.username == username))
+    else:
+        cached = await current_user_cache.get(current_user_key(user_id))
+        if cached is not None:
+            # merge без загрузки: объект привязывается к сессии запроса без обращения к БД.
+            # Он может отставать на TTL, поэтому изменяющие эндпоинты перечитывают
+            # пользователя через db.get(..., populate_existing=True)
+            decoded = await decoded_users.get(user_id)
+            if decoded is None or decoded[0] != cached:
+                decoded = (cached, _deserialize_user(cached))
+                await decoded_users.set(user_id, decoded)
+            return await db.merge(decoded[1], load=False)
+        user = await db.get(User, user_id)
+        if user:
+            await current_user_cache.set(current_user_key(user_id), _serialize_user(user))
     if not user:
         raise credentials_exception
     
     return user
 
+async def get_optional_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Optional[User]:
+    """
+    Текущий пользователь или None, если токена нет или он недействителен.
+    """
+    if not token:
+        return None
+    try:
+        return await get_current_user(token, db)
+    except HTTPException:
+        return None
+
 async def get_current_active_user(current_user: dict = Depends(get_current_user)):
     #if not current_user.get("is_active", True):
     #    raise HTTPException(status_code=400, detail="Inactive user")
@@ -0,0 +1,35 @@
+from sqlalchemy import Select
+
+from app.database.base_recipe import RecipeFilter
+from app.models.recipe import Recipe
+
+
+def apply_recipe_filters(query: Select, filters: RecipeFilter) -> Select:
+    """
+    Добавляет к запросу условия фильтрации рецептов.
+
+    Аргументы:
+        query: Запрос select(...) по таблице рецептов
+        filters: Модель RecipeFilter
+
+    Возвращает:
+        Запрос с условиями WHERE
+    """
+    # Фильтрация по тегам (если хотя бы один тег совпадает)
+    if filters.tags:
+        query = query.where(Recipe.tags.overlap(filters.tags))
+    
+    # Фильтрация по времени приготовления
+    if filters.max_cooking_time:
+        query = query.where(Recipe.cooking_time_minutes <= filters.max_cooking_time)
+    if filters.min_cooking_time:
+        query = query.where(Recipe.cooking_time_minutes >= filters.min_cooking_time)
+    
+    # Фильтрация по сложности
+    if filters.difficulty:
+        query = query.where(Recipe.difficulty == filters.difficulty)
+    
+    # Фильтрация по ингредиентам (если все указанные ингредиенты присутствуют)
+    if filters.ingredients:
+        query = query.where(Recipe.ingredients.contains(filters.ingredients))
+    return query
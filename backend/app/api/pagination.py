@@ -0,0 +1,98 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Union
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import DateTime, Select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Ключ сортировки: created_at для обычных списков или релевантность для поиска
+SortKey = Union[datetime, float]
+
+# Вид курсора хранится в нём самом: курсор списка, присланный в поиск
+# (и наоборот), отклоняется с 400, а не доходит до запроса с ключом не того типа
+CURSOR_TIME = "t"
+CURSOR_RANK = "r"
+
+
+def encode_cursor(key: SortKey, row_id: int) -> str:
+    """
+    Кодирует ключ последней строки страницы в непрозрачный курсор.
+    """
+    if isinstance(key, datetime):
+        raw = [CURSOR_TIME, key.isoformat(), row_id]
+    else:
+        raw = [CURSOR_RANK, float(key), row_id]
+    return base64.urlsafe_b64encode(json.dumps(raw).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str) -> tuple[SortKey, int]:
+    """
+    Декодирует курсор, полученный от клиента, обратно в (ключ сортировки, id).
+
+    Аргументы:
+        cursor: Курсор из X-Next-Cursor
+        kind: Какой курсор ждёт эндпоинт: CURSOR_TIME или CURSOR_RANK
+
+    Возвращает:
+        (ключ сортировки, id); курсор другого вида или с неверными типами — 400
+    """
+    invalid = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise invalid
+    if not isinstance(value, list):
+        raise invalid
+    if len(value) == 2:
+        # Курсоры, выданные до появления вида: [ключ, id]
+        value = [CURSOR_TIME if isinstance(value[0], str) else CURSOR_RANK, *value]
+    if len(value) != 3:
+        raise invalid
+    cursor_kind, key, row_id = value
+    if cursor_kind != kind or type(row_id) is not int:
+        raise invalid
+    if kind == CURSOR_TIME and isinstance(key, str):
+        try:
+            return datetime.fromisoformat(key), row_id
+        except ValueError:
+            raise invalid
+    if kind == CURSOR_RANK and type(key) in (int, float):
+        return float(key), row_id
+    raise invalid
+
+
+def paginate(
+    query: Select,
+    key_column,
+    id_column,
+    cursor: Optional[str],
+    skip: int,
+    limit: int,
+) -> Select:
+    """
+    Применяет стабильную сортировку (key DESC, id DESC) и пагинацию.
+
+    Если передан курсор, используется keyset-пагинация по индексу
+    (created_at, id) — глубина страницы не влияет на время запроса.
+    Иначе для старых клиентов остаётся пагинация через skip.
+    Вид курсора определяется типом key_column: дата — список, иначе — релевантность.
+    """
+    query = query.order_by(key_column.desc(), id_column.desc())
+    if cursor:
+        kind = CURSOR_TIME if isinstance(key_column.type, DateTime) else CURSOR_RANK
+        query = query.where(tuple_(key_column, id_column) < decode_cursor(cursor, kind))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def set_next_cursor(response: Response, keys: Sequence[tuple[SortKey, int]], limit: int) -> None:
+    """
+    Если страница заполнена целиком, отдаёт курсор на следующую в заголовке X-Next-Cursor.
+    """
+    if len(keys) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*keys[-1])
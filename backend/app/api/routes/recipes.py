@@ -1,32 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
-from app.database.base_recipe import RecipeBase, RecipeCreate, RecipeInDB, RecipeUpdate
-from app.database.connection import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status, UploadFile, File, Query
+from app.database.base_recipe import (
+    RecipeBase, RecipeBatch, RecipeCreate, RecipeFacets, RecipeFilter, RecipeInDB, RecipeListItem, RecipeUpdate,
+)
+from app.database.connection import SessionLocal, get_db
+from app.database.replicas import get_read_db
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
-from app.models.recipe import Recipe
+from sqlalchemy import any_, func, literal_column, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.recipe import Recipe, SEARCH_CONFIG
 from app.models.user import User
-from app.api.auth import get_current_active_user
+from app.models.fave import FavoriteRecipe
+from app.api.auth import get_current_active_user, get_optional_user
+from app.api.filters import apply_recipe_filters
+from app.api.pagination import paginate, set_next_cursor
+from app.metrics import InstrumentedRoute
+from app.cache import cache, facets_key, recipe_key
+from app.facets import (
+    TAG_FACET_LIMIT, apply_facet_delta, facet_counts, facet_delta, facets_cache, facets_generation, facets_of,
+    invalidate_facets,
+)
+from app.images import image_processor
+from app.storage import discard_if_unused, save_upload, upload_extension
+from app.bulk import EXPORT_FORMATS, export_recipes, import_recipes
 from datetime import datetime
-from psycopg2 import IntegrityError
+from sqlalchemy.exc import IntegrityError
 import logging
-import aiofiles
-import uuid
 import os
 IMAGES_DIR = "static/images"
+BATCH_MAX_IDS = 100
 
 logger = logging.getLogger(__name__)
 
 
 recipe_router = APIRouter(
     tags=["Recipe"],
+    route_class=InstrumentedRoute,
 )
 
 @recipe_router.post("/create", response_model=RecipeInDB, status_code=status.HTTP_201_CREATED)
 async def create_new_recipe(
     recipe: RecipeCreate = Depends(RecipeCreate.as_form), 
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Создаёт новый рецепт.
@@ -49,12 +66,12 @@ async def create_new_recipe(
     Возвращает:
         Данные созданного рецепта.
     """
-    print("\033[33m DEBUG: \033[0m" + f'Начало создания нового рецепта: {recipe.title}')
-    print("\033[33m DEBUG: \033[0m" + f'Проверка на авторизацию.')
+    logger.debug("Начало создания нового рецепта: %s", recipe.title)
+    logger.debug("Проверка на авторизацию.")
     if current_user == None:
         raise HTTPException(status_code=401, detail="Log in is needed to create a recipe")
     
-    print("\033[33m DEBUG: \033[0m" + f'Проверка на попытку создать рецепт от чужого лица или без автора.')
+    logger.debug("Проверка на попытку создать рецепт от чужого лица или без автора.")
     if current_user.id != recipe.author_id:
         raise HTTPException(status_code=403, detail="Cannot create a recipe using other user as author")
     
@@ -72,19 +89,180 @@ async def create_new_recipe(
         steps=recipe.steps,
         author_id=recipe.author_id,
     )
-    print("\033[33m DEBUG: \033[0m" + f'Внесение рецепта {recipe.title} в БД.')
+    logger.debug("Внесение рецепта %s в БД.", recipe.title)
     db.add(new_recipe)
-    db.commit()
-    db.refresh(new_recipe)  # Обновляем объект, чтобы получить ID
-    print("\033[33m DEBUG: \033[0m" + f'Новый рецепт "{new_recipe.title}" с ID {new_recipe.id} создан.')
+    await apply_facet_delta(db, facets_of(new_recipe))
+    await db.commit()
+    await invalidate_facets()
+    await db.refresh(new_recipe)  # Обновляем объект, чтобы получить ID
+    logger.debug('Новый рецепт "%s" с ID %s создан.', new_recipe.title, new_recipe.id)
     
     return new_recipe
 
 
+@recipe_router.post("/import")
+async def import_recipes_ndjson(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Массовый импорт рецептов текущего пользователя.
+
+    Тело запроса — NDJSON (application/x-ndjson): по одному объекту RecipeBase
+    на строку. Тело читается потоком и вставляется пачками, поэтому размер
+    файла не ограничен памятью сервера.
+
+    Аргументы:
+        request: Запрос, тело которого читается потоком
+        current_user: Объект User, полученный функцией get_current_active_user
+        db: Сессия
+
+    Возвращает:
+        {"inserted": Число, "failed": Число, "errors": [{"line", "detail"}], "errors_truncated": bool}
+    """
+    report = await import_recipes(db, request.stream(), author_id=current_user.id)
+    return report.as_dict()
+
+
+@recipe_router.get("/search", response_model=list[RecipeInDB])
+async def search_recipes(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос"),
+    cursor: str = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+    limit: int = Query(10, ge=1, le=100),
+    filters: RecipeFilter = Depends(RecipeFilter.as_query),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Полнотекстовый поиск рецептов по названию, описанию и шагам.
+
+    Аргументы:
+        q: Поисковый запрос (поддерживает "фразы", OR и -исключения)
+        cursor: Непрозрачный курсор keyset-пагинации
+        limit: Сколько рецептов вернуть (максимум 100)
+        filters: Модель RecipeFilter, как в fetch_recipes
+        db: Сессия базы данных
+
+    Возвращает:
+        Список рецептов, отсортированных по релевантности.
+        Курсор следующей страницы передаётся в заголовке X-Next-Cursor.
+    """
+    # Конфигурация подставляется литералом, чтобы совпасть с выражением в GIN-индексе
+    ts_query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+    rank = func.ts_rank(Recipe.search_vector, ts_query)
+
+    query = select(Recipe, rank).where(Recipe.search_vector.bool_op("@@")(ts_query))
+    query = apply_recipe_filters(query, filters)
+    query = paginate(query, rank, Recipe.id, cursor, 0, limit)
+
+    rows = (await db.execute(query)).all()
+    set_next_cursor(response, [(row_rank, recipe.id) for recipe, row_rank in rows], limit)
+    return [recipe for recipe, _ in rows]
+
+
+@recipe_router.get("/export")
+async def export_recipes_stream(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Формат выгрузки: ndjson или csv"),
+    filters: RecipeFilter = Depends(RecipeFilter.as_query),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Потоковая выгрузка рецептов для аналитики и резервных копий.
+
+    Рецепты читаются серверным курсором и отдаются по мере чтения,
+    поэтому память сервера не зависит от размера таблицы.
+
+    Аргументы:
+        format: ndjson (по объекту RecipeInDB на строку) или csv
+        filters: Модель RecipeFilter, как в fetch_recipes
+        current_user: Объект User, полученный функцией get_current_active_user
+
+    Возвращает:
+        StreamingResponse с файлом recipes.<format>
+    """
+    query = apply_recipe_filters(select(Recipe), filters)
+
+    async def stream():
+        # Своя сессия: сессия из get_db закрывается до того, как поток будет прочитан
+        async with SessionLocal() as db:
+            async for chunk in export_recipes(db, query, format):
+                yield chunk
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="recipes.{format}"'},
+    )
+
+
+@recipe_router.get("/batch", response_model=RecipeBatch)
+async def fetch_recipes_batch(
+    ids: list[int] = Query(..., description="Идентификаторы рецептов: ?ids=1&ids=2"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Получение нескольких рецептов одним запросом вместо вызова fetch_recipe на каждый.
+
+    Аргументы:
+        ids: Идентификаторы рецептов (не больше BATCH_MAX_IDS, повторы игнорируются)
+        db: Сессия
+
+    Возвращает:
+        {"recipes": рецепты в порядке ids, "missing": ID, которых нет в БД}
+    """
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Too many ids, maximum is {BATCH_MAX_IDS}")
+
+    # Один запрос WHERE id = ANY(:ids) по первичному ключу
+    recipes = (await db.scalars(select(Recipe).where(Recipe.id == any_(ids)))).all()
+    by_id = {recipe.id: recipe for recipe in recipes}
+    return {
+        "recipes": [by_id[recipe_id] for recipe_id in ids if recipe_id in by_id],
+        "missing": [recipe_id for recipe_id in ids if recipe_id not in by_id],
+    }
+
+
+@recipe_router.get("/facets", response_model=RecipeFacets)
+async def fetch_recipe_facets(
+    filters: RecipeFilter = Depends(RecipeFilter.as_query),
+    tag_limit: int = Query(TAG_FACET_LIMIT, ge=1, le=500, description="Сколько самых частых тегов вернуть"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Количество рецептов по каждому тегу, уровню сложности и диапазону времени
+    для боковой панели фильтров.
+
+    Аргументы:
+        filters: Модель RecipeFilter, как в fetch_recipes. Счётчики каждой группы
+            считаются с учётом остальных фильтров, но без её собственного
+        tag_limit: Сколько самых частых тегов вернуть
+        db: Сессия
+
+    Возвращает:
+        {"total": Число, "tags": {...}, "difficulty": {...}, "cooking_time": {...}}
+    """
+    filters_json = filters.model_dump_json(exclude_none=True)
+    if filters_json == "{}":
+        # Без фильтров ответ строится по готовым счётчикам — кеш не нужен
+        return await facet_counts(db, filters, tag_limit)
+
+    # Поколение читается до запроса к БД: если рецепт изменится во время подсчёта,
+    # ответ ляжет под уже устаревшее поколение и читаться не будет
+    key = facets_key(await facets_generation(), filters_json, tag_limit)
+    cached = await facets_cache.get(key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    payload = RecipeFacets(**await facet_counts(db, filters, tag_limit)).model_dump_json().encode()
+    await facets_cache.set(key, payload)
+    return Response(content=payload, media_type="application/json")
+
+
 @recipe_router.get("/{recipe_id}", response_model=RecipeInDB)
 async def fetch_recipe(
     recipe_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Получение данных рецепта
@@ -94,20 +272,27 @@ async def fetch_recipe(
         db: Сессия
     
     Возвращает:
-        Данные рецепта
+        Данные рецепта (из кеша, если они там есть)
     """
-    print("\033[33m DEBUG: \033[0m" + f'Проверка на наличие рецепта с ID {recipe_id} в БД.')
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    cached = await cache.get(recipe_key(recipe_id))
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    logger.debug("Проверка на наличие рецепта с ID %s в БД.", recipe_id)
+    recipe = await db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
-    return recipe
+
+    payload = RecipeInDB.model_validate(recipe).model_dump_json().encode()
+    await cache.set(recipe_key(recipe_id), payload)
+    return Response(content=payload, media_type="application/json")
 
 
 @recipe_router.patch("/update/{recipe_id}", response_model=RecipeInDB)
 async def update_user(
     recipe_id: int,
     recipe_data: RecipeUpdate = Depends(RecipeUpdate.as_form),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -122,29 +307,57 @@ async def update_user(
     Возвращает:
         Обновлённый рецепт.
     """
-    print("\033[33m DEBUG: \033[0m" + f'Обновление рецепта с ID {recipe_id}.')
-    print("\033[33m DEBUG: \033[0m" + f'Проверка на наличие рецепта с ID {recipe_id} в БД.')
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    logger.debug("Обновление рецепта с ID %s.", recipe_id)
+    logger.debug("Проверка на наличие рецепта с ID %s в БД.", recipe_id)
+    # Блокировка строки до коммита: иначе параллельное изменение того же рецепта
+    # посчитает дельту счётчиков фильтров от тех же старых значений
+    recipe = await db.get(Recipe, recipe_id, with_for_update=True)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     
-    print("\033[33m DEBUG: \033[0m" + f'Проверка на попытку изменить чужой рецепт.')
+    logger.debug("Проверка на попытку изменить чужой рецепт.")
     if current_user.id != recipe.author_id:
         raise HTTPException(status_code=403, detail="Cannot update somebody else's recipe")
     
-    print("\033[33m DEBUG: \033[0m" + f'Обновление полей {recipe_data}')
+    logger.debug("Обновление полей %s", recipe_data)
+    old_facets = facets_of(recipe)
     for field, value in recipe_data.model_dump(exclude_unset=True).items():
         setattr(recipe, field, value)
-    db.commit()
-    db.refresh(recipe)
+    await apply_facet_delta(db, facet_delta(old_facets, facets_of(recipe)))
+    await db.commit()
+    await cache.invalidate(recipe_key(recipe_id))
+    await invalidate_facets()
+    await db.refresh(recipe)
     return recipe
 
 
+async def build_image_variants(recipe_id: int, image_path: str, file_path: str) -> None:
+    """
+    Фоновая задача: создаёт уменьшенные WebP-копии обложки и записывает их пути.
+    """
+    variants = await image_processor.variants(file_path)
+    if variants is None:
+        return
+    async with SessionLocal() as db:
+        result = await db.execute(
+            update(Recipe)
+            .where(Recipe.id == recipe_id, Recipe.image == image_path)
+            .values(image_variants=variants)
+        )
+        await db.commit()
+        if result.rowcount == 0:
+            # Обложку успели сменить или рецепт удалён — варианты не нужны
+            await discard_if_unused(db, Recipe.image, image_path, variants)
+            return
+    await cache.invalidate(recipe_key(recipe_id))
+
+
 @recipe_router.post("/upload-image/{recipe_id}")
 async def upload_image(
     recipe_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),  
 ):
     """
@@ -152,6 +365,7 @@ async def upload_image(
     
     Аргументы:
         recipe_id: Идентификатор изменяемого пользователя
+        background_tasks: Очередь фоновых задач (создание уменьшенных копий)
         file: Файл полученный из формы
         db: Сессия
         current_user: Словарь с данными аутентифицированного пользователя
@@ -159,54 +373,54 @@ async def upload_image(
     Возвращает:
         {"message":"Avatar uploaded!", "path":"Путь к файлу в папке /static"}
     """
-    print("\033[33m DEBUG: \033[0m" + f'Смена обложки рецепта с ID {recipe_id}.')
-    print("\033[33m DEBUG: \033[0m" + f'Проверка на наличие рецепта с ID {recipe_id} в БД.')
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    logger.debug("Смена обложки рецепта с ID %s.", recipe_id)
+    logger.debug("Проверка на наличие рецепта с ID %s в БД.", recipe_id)
+    recipe = await db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     if current_user.id != recipe.author_id:
         raise HTTPException(status_code=403, detail="Cannot edit somebody else's recipe")
     
-    print("\033[33m DEBUG: \033[0m" + f'Валидация файла.')
-    allowed_extensions = {"jpg", "jpeg", "png"}
-    file_extension = file.filename.split(".")[-1].lower()
-    if file_extension not in allowed_extensions:
-        raise HTTPException(status_code=400, detail="Invalid file type")
-    
-    if file.size > 5 * 1024 * 1024:  # 5MB
-        raise HTTPException(status_code=400, detail="File too large")
+    logger.debug("Валидация файла.")
+    file_extension = upload_extension(file)
 
-    print("\033[33m DEBUG: \033[0m" + f'Генерация нового имени файла.')
-    new_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = os.path.join(IMAGES_DIR, new_filename)
+    logger.debug("Потоковое сохранение файла под хешем содержимого.")
+    upload = await save_upload(file, IMAGES_DIR, file_extension)
+    file_path, image_path = upload.path, upload.url
+    if recipe.image == image_path:
+        upload.discard()
+        return {"message": "Image uploaded!", "path": image_path}
 
-    print("\033[33m DEBUG: \033[0m" + f'Асинхронное сохранение файла.')
+    old_image, old_variants = recipe.image, recipe.image_variants
     try:
-        async with aiofiles.open(file_path, "wb") as buffer:
-            await buffer.write(await file.read())
-        
-        if recipe.image:
-            print("\033[33m DEBUG: \033[0m" + f'Удаление прошлой обложки.')
-            old_path = os.path.join(IMAGES_DIR, os.path.basename(recipe.image))
-            if os.path.exists(old_path):
-                os.unlink(old_path)
-        print("\033[33m DEBUG: \033[0m" + f'Запись пути к новой обложке в БД.')
-        image_path = f"/static/images/{new_filename}"
+        logger.debug("Запись пути к новой обложке в БД.")
         recipe.image = image_path
-        db.commit()
-        
-        return {"message": "Image uploaded!", "path": image_path}
-    
+        recipe.image_variants = None
+        await upload.publish(db)
+        await db.commit()
     except Exception as e:
-        if os.path.exists(file_path):
-            os.unlink(file_path)
+        upload.discard()
+        await db.rollback()
+        # Файл мог успеть появиться до неудачного commit — удаляется, только если не нужен другим
+        await discard_if_unused(db, Recipe.image, image_path, None)
         raise HTTPException(status_code=500, detail=str(e))
 
+    await cache.invalidate(recipe_key(recipe_id))
+    background_tasks.add_task(build_image_variants, recipe_id, image_path, file_path)
+    try:
+        logger.debug("Удаление прошлой обложки, если она больше не используется.")
+        await discard_if_unused(db, Recipe.image, old_image, old_variants)
+    except Exception:
+        # Обложка уже сменилась; старый файл просто останется на диске
+        logger.exception("Не удалось удалить прошлую обложку рецепта %s", recipe_id)
+
+    return {"message": "Image uploaded!", "path": image_path}
+
 @recipe_router.delete("/delete/{recipe_id}", response_model=None)
 async def delete_recipe(
     recipe_id: int, 
-    db: Session = Depends(get_db)) -> dict:
+    db: AsyncSession = Depends(get_db)) -> dict:
     """
     Удаление рецепта из базы данных.
 
@@ -218,84 +432,89 @@ async def delete_recipe(
         Сообщение об удалении рецепта с идентификатором.
     """
     try:
-        print("\033[33m DEBUG: \033[0m" + f'Начало удаления рецепта ID {recipe_id}')
-        recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+        logger.debug("Начало удаления рецепта ID %s", recipe_id)
+        # Блокировка строки: счётчики фильтров уменьшаются по значениям, которые удаляются
+        recipe = await db.get(Recipe, recipe_id, with_for_update=True)
         
         if not recipe:
-            print("\033[33m DEBUG: \033[0m" + f"Рецепт с ID {recipe_id} не найден")
+            logger.debug("Рецепт с ID %s не найден", recipe_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Recipe not found"
             )
         
-        db.delete(recipe)
-        db.commit()
+        await apply_facet_delta(db, facet_delta(old=facets_of(recipe)))
+        await db.delete(recipe)
+        await db.commit()
+        await cache.invalidate(recipe_key(recipe_id))
+        await invalidate_facets()
         
         return {"message": f"Рецепт с ID {recipe_id} удалён"}
             
     except IntegrityError as e:
-        db.rollback()
-        print("\033[33m DEBUG: \033[0m" + f'Ошибка целостности при удалении рецепта "{recipe.title}" с ID {recipe_id}')
+        await db.rollback()
+        logger.warning("Ошибка целостности при удалении рецепта с ID %s", recipe_id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Database integrity error occurred"
         )
     except Exception as e:
-        db.rollback()
-        print("\033[33m DEBUG: \033[0m" + f'Ошибка целостности при удалении рецепта "{recipe.title}" с ID {recipe_id}', exc_info=True)
+        await db.rollback()
+        logger.exception("Ошибка при удалении рецепта с ID %s", recipe_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
 
-@recipe_router.get("/", response_model=list[RecipeInDB])
+@recipe_router.get("/", response_model=list[RecipeListItem])
 async def fetch_recipes(
+    response: Response,
     skip: int = Query(0, ge=0),
+    cursor: str = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
     limit: int = Query(10, ge=1, le=100),
-    tags: list[str] = Query(None, description="Фильтрация по тегам"),
-    max_cooking_time: int = Query(None, ge=1, description="Максимальное время приготовления в минутах"),
-    min_cooking_time: int = Query(None, ge=1, description="Минимальное время приготовления в минутах"),
-    difficulty: int = Query(None, ge=1, le=5, description="Уровень сложности (1-5)"),
-    ingredients: list[str] = Query(None, description="Фильтрация по ингредиентам"),
-    db: Session = Depends(get_db),
+    filters: RecipeFilter = Depends(RecipeFilter.as_query),
+    current_user: User = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Получение списка рецептов с пагинацией и фильтрацией
     
     Аргументы:
-        skip: Сколько рецептов пропустить
+        skip: Сколько рецептов пропустить (устаревший способ, игнорируется при cursor)
+        cursor: Непрозрачный курсор keyset-пагинации
         limit: Сколько рецептов вернуть (максимум 100)
-        tags: Фильтрация по тегам (массив строк)
-        max_cooking_time: Максимальное время приготовления в минутах
-        min_cooking_time: Минимальное время приготовления в минутах
-        difficulty: Уровень сложности (1-5)
-        ingredients: Фильтрация по ингредиентам (массив строк)
+        filters: Модель RecipeFilter
+            {
+            tags: Фильтрация по тегам (массив строк)
+            max_cooking_time: Максимальное время приготовления в минутах
+            min_cooking_time: Минимальное время приготовления в минутах
+            difficulty: Уровень сложности (1-5)
+            ingredients: Фильтрация по ингредиентам (массив строк)
+            }
+        current_user: Пользователь, если запрос с токеном — тогда заполняется is_favorited
         db: Сессия базы данных
     
     Возвращает:
-        Список отфильтрованных рецептов
+        Список отфильтрованных рецептов, отсортированных от новых к старым.
+        Курсор следующей страницы передаётся в заголовке X-Next-Cursor.
     """
-    query = db.query(Recipe)
-    
-    # Фильтрация по тегам (если хотя бы один тег совпадает)
-    if tags:
-        query = query.filter(Recipe.tags.overlap(tags))
-    
-    # Фильтрация по времени приготовления
-    if max_cooking_time:
-        query = query.filter(Recipe.cooking_time_minutes <= max_cooking_time)
-    if min_cooking_time:
-        query = query.filter(Recipe.cooking_time_minutes >= min_cooking_time)
-    
-    # Фильтрация по сложности
-    if difficulty:
-        query = query.filter(Recipe.difficulty == difficulty)
-    
-    # Фильтрация по ингредиентам (если все указанные ингредиенты присутствуют)
-    if ingredients:
-        query = query.filter(Recipe.ingredients.contains(ingredients))
+    query = apply_recipe_filters(select(Recipe), filters)
     
     # Применение пагинации
-    recipes = query.offset(skip).limit(limit).all()
-    return recipes
+    query = paginate(query, Recipe.created_at, Recipe.id, cursor, skip, limit)
+    recipes = (await db.scalars(query)).all()
+    set_next_cursor(response, [(r.created_at, r.id) for r in recipes], limit)
+    if current_user is None or not recipes:
+        return recipes
 
+    # Статус избранного для всей страницы одним запросом по первичному ключу
+    favorited = set(await db.scalars(
+        select(FavoriteRecipe.recipe_id).where(
+            FavoriteRecipe.user_id == current_user.id,
+            FavoriteRecipe.recipe_id == any_([r.id for r in recipes]),
+        )
+    ))
+    return [
+        RecipeListItem.model_validate(r).model_copy(update={"is_favorited": r.id in favorited})
+        for r in recipes
+    ]
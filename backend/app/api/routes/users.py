@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status, UploadFile, File, Form
 from fastapi.staticfiles import StaticFiles
 AVATARS_DIR = "static/avatars"
+FAVORITED_MAX_IDS = 100
+import logging
 import os
-import aiofiles
-import uuid
 from typing import List
 from app.database.base_user import UserBase, UserCreate, UserUpdate, UserInDB
 from app.database.base_fave import FavoriteRecipeResponse
@@ -11,10 +11,13 @@ from app.database.base_recipe import RecipeInDB
 from app.models.user import User
 from app.models.fave import FavoriteRecipe
 from app.models.recipe import Recipe
-from app.database.connection import get_db
+from app.database.connection import SessionLocal, get_db
+from app.database.replicas import get_read_db
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from psycopg2 import IntegrityError
+from sqlalchemy import any_, delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
 
 
@@ -22,19 +25,28 @@ from app.api.auth import (
     create_access_token,
     get_current_user,
     get_current_active_user,
-    verify_password,
+    invalidate_current_user,
+    password_hasher,
     ACCESS_TOKEN_EXPIRE_MINUTES,
-    pwd_context
 )
+from app.api.pagination import paginate, set_next_cursor
+from app.metrics import InstrumentedRoute
+from app.cache import cache, recipe_key, user_key
+from app.likes import likes_counter
+from app.images import image_processor
+from app.storage import discard_if_unused, save_upload, upload_extension
+
+logger = logging.getLogger(__name__)
 
 user_router = APIRouter(
     tags=["User"],
+    route_class=InstrumentedRoute,
 )
 
 @user_router.post("/signup", response_model=UserInDB, status_code=status.HTTP_201_CREATED)
 async def sign_user_up(
     user: UserCreate = Depends(UserCreate.as_form), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Регистрирует нового пользователя.
@@ -48,34 +60,34 @@ async def sign_user_up(
     Возвращает:
         Данные созданного пользователя.
     """
-    print("\033[33m DEBUG: \033[0m" + f'Получены данные: {user}')
-    print("\033[33m DEBUG: \033[0m" + f'Проверка существование пользователя {user.username} и почты {user.email}')
-    existing_user = db.query(User).filter(
+    logger.debug("Регистрация пользователя %s", user.username)
+    logger.debug("Проверка существование пользователя %s и почты %s", user.username, user.email)
+    existing_user = await db.scalar(select(User).where(
         (User.email == user.email) | (User.username == user.username)
-    ).first()
+    ))
     
     if existing_user:
         raise HTTPException(status_code=400, detail="Email or username already exists")
     
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
 
     new_user = User(
         username=user.username,
         email=user.email,
         password_hash=hashed_password,
     )
-    print("\033[33m DEBUG: \033[0m" + f'Внесение пользователя {user.username} в БД.')
+    logger.debug("Внесение пользователя %s в БД.", user.username)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)  # Обновляем объект, чтобы получить ID
-    print("\033[33m DEBUG: \033[0m" + f'Новый пользователь с ID {new_user.id} создан.')
+    await db.commit()
+    await db.refresh(new_user)  # Обновляем объект, чтобы получить ID
+    logger.debug("Новый пользователь с ID %s создан.", new_user.id)
     
     return new_user
 
 @user_router.get("/{user_id}", response_model=UserInDB)
 async def fetch_user(
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Получение данных о пользователе.
@@ -85,20 +97,27 @@ async def fetch_user(
         db: Сессия
     
     Возвращает: 
-        Данные пользователя.
+        Данные пользователя (из кеша, если они там есть).
     """
-    print("\033[33m DEBUG: \033[0m" + f'Проверка на наличие пользователя с ID {user_id} в БД.')
-    user = db.query(User).filter(User.id == user_id).first()
+    cached = await cache.get(user_key(user_id))
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    logger.debug("Проверка на наличие пользователя с ID %s в БД.", user_id)
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+
+    payload = UserInDB.model_validate(user).model_dump_json().encode()
+    await cache.set(user_key(user_id), payload)
+    return Response(content=payload, media_type="application/json")
 
 
 @user_router.patch("/update/{user_id}", response_model=UserInDB)
 async def update_user(
     user_id: int,
     user_data: UserUpdate = Depends(UserUpdate.as_form),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -113,31 +132,58 @@ async def update_user(
     Возвращает:
         Обновлённые данные пользователя.
     """
-    print("\033[33m DEBUG: \033[0m" + f'Обновление пользователя с ID {user_id}.')
-    print("\033[33m DEBUG: \033[0m" + f'Проверка на попытку изменить другого пользователя.')
+    logger.debug("Обновление пользователя с ID %s.", user_id)
+    logger.debug("Проверка на попытку изменить другого пользователя.")
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Cannot update another user")
     
-    print("\033[33m DEBUG: \033[0m" + f'Проверка на наличие пользователя с ID {user_id} в БД.')
-    user = db.query(User).filter(User.id == user_id).first()
+    logger.debug("Проверка на наличие пользователя с ID %s в БД.", user_id)
+    # populate_existing: в сессии уже может быть текущий пользователь из кеша авторизации,
+    # а изменения должны опираться на актуальную строку
+    user = await db.get(User, user_id, populate_existing=True)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     for field, value in user_data.model_dump(exclude_unset=True).items():
         if field == "password":
-            user.password_hash = pwd_context.hash(value)
+            user.password_hash = await password_hasher.hash(value)
         else:
             setattr(user, field, value)
-    print("\033[33m DEBUG: \033[0m" + f'Обновление полей {user_data}')
-    db.commit()
-    db.refresh(user)
+    logger.debug("Обновление полей %s", user_data)
+    await db.commit()
+    await cache.invalidate(user_key(user_id))
+    await invalidate_current_user(user_id)
+    await db.refresh(user)
     return user
 
+async def build_avatar_variants(user_id: int, avatar_path: str, file_path: str) -> None:
+    """
+    Фоновая задача: создаёт уменьшенные WebP-копии аватара и записывает их пути.
+    """
+    variants = await image_processor.variants(file_path)
+    if variants is None:
+        return
+    async with SessionLocal() as db:
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id, User.profile_picture == avatar_path)
+            .values(profile_picture_variants=variants)
+        )
+        await db.commit()
+        if result.rowcount == 0:
+            # Аватар успели сменить или пользователь удалён — варианты не нужны
+            await discard_if_unused(db, User.profile_picture, avatar_path, variants)
+            return
+    await cache.invalidate(user_key(user_id))
+    await invalidate_current_user(user_id)
+
+
 @user_router.post("/upload-avatar/{user_id}")
 async def upload_avatar(
     user_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),  
 ):
     """
@@ -145,6 +191,7 @@ async def upload_avatar(
     
     Аргументы:
         user_id: Идентификатор изменяемого пользователя
+        background_tasks: Очередь фоновых задач (создание уменьшенных копий)
         file: Файл полученный из формы
         db: Сессия
         current_user: Словарь с данными аутентифицированного пользователя
@@ -152,53 +199,55 @@ async def upload_avatar(
     Возвращает:
         {"message":"Avatar uploaded!", "path":"Путь к файлу в папке /static"}
     """
-    print("\033[33m DEBUG: \033[0m" + f'Смена аватара пользователя с ID {user_id}.')
+    logger.debug("Смена аватара пользователя с ID %s.", user_id)
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Cannot update another user")
     
-    user = db.query(User).filter(User.id == user_id).first()
+    # Не копия из кеша авторизации, а актуальная строка: с ней сравнивается новый аватар
+    user = await db.get(User, user_id, populate_existing=True)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    print("\033[33m DEBUG: \033[0m" + f'Валидация файла.')
-    allowed_extensions = {"jpg", "jpeg", "png"}
-    file_extension = file.filename.split(".")[-1].lower()
-    if file_extension not in allowed_extensions:
-        raise HTTPException(status_code=400, detail="Invalid file type")
-    
-    if file.size > 5 * 1024 * 1024:  # 5MB
-        raise HTTPException(status_code=400, detail="File too large")
+    logger.debug("Валидация файла.")
+    file_extension = upload_extension(file)
 
-    print("\033[33m DEBUG: \033[0m" + f'Генерация нового имени файла.')
-    new_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = os.path.join(AVATARS_DIR, new_filename)
+    logger.debug("Потоковое сохранение файла под хешем содержимого.")
+    upload = await save_upload(file, AVATARS_DIR, file_extension)
+    file_path, avatar_path = upload.path, upload.url
+    if user.profile_picture == avatar_path:
+        upload.discard()
+        return {"message": "Avatar uploaded!", "path": avatar_path}
 
-    print("\033[33m DEBUG: \033[0m" + f'Асинхронное сохранение файла.')
+    old_avatar, old_variants = user.profile_picture, user.profile_picture_variants
     try:
-        async with aiofiles.open(file_path, "wb") as buffer:
-            await buffer.write(await file.read())
-        
-        if user.profile_picture:
-            print("\033[33m DEBUG: \033[0m" + f'Удаление прошлого аватара.')
-            old_path = os.path.join(AVATARS_DIR, os.path.basename(user.profile_picture))
-            if os.path.exists(old_path):
-                os.unlink(old_path)
-        print("\033[33m DEBUG: \033[0m" + f'Запись пути к новому аватару в БД.')
-        avatar_path = f"/static/avatars/{new_filename}"
+        logger.debug("Запись пути к новому аватару в БД.")
         user.profile_picture = avatar_path
-        db.commit()
-        
-        return {"message": "Avatar uploaded!", "path": avatar_path}
-    
+        user.profile_picture_variants = None
+        await upload.publish(db)
+        await db.commit()
     except Exception as e:
-        if os.path.exists(file_path):
-            os.unlink(file_path)
+        upload.discard()
+        await db.rollback()
+        # Файл мог успеть появиться до неудачного commit — удаляется, только если не нужен другим
+        await discard_if_unused(db, User.profile_picture, avatar_path, None)
         raise HTTPException(status_code=500, detail=str(e))
 
+    await cache.invalidate(user_key(user_id))
+    await invalidate_current_user(user_id)
+    background_tasks.add_task(build_avatar_variants, user_id, avatar_path, file_path)
+    try:
+        logger.debug("Удаление прошлого аватара, если он больше не используется.")
+        await discard_if_unused(db, User.profile_picture, old_avatar, old_variants)
+    except Exception:
+        # Аватар уже сменился; старый файл просто останется на диске
+        logger.exception("Не удалось удалить прошлый аватар пользователя %s", user_id)
+
+    return {"message": "Avatar uploaded!", "path": avatar_path}
+
 @user_router.delete("/delete/{user_id}", response_model=None)
 async def delete_user(
     user_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
     ) -> dict:
     """
     Удаление аккаунта пользователя из базы данных.
@@ -211,31 +260,34 @@ async def delete_user(
         Сообщение об удалении пользователя с идентификатором.
     """
     try:
-        print("\033[33m DEBUG: \033[0m" + f'Начало удаления пользователя с ID {user_id}')
-        user = db.query(User).filter(User.id == user_id).first()
+        logger.debug("Начало удаления пользователя с ID %s", user_id)
+        # Актуальная строка, а не копия текущего пользователя из кеша авторизации
+        user = await db.get(User, user_id, populate_existing=True)
         
         if not user:
-            print("\033[33m DEBUG: \033[0m" + f"Пользователь с ID {user_id} не найден")
+            logger.debug("Пользователь с ID %s не найден", user_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        db.delete(user)
-        db.commit()
+        await db.delete(user)
+        await db.commit()
+        await cache.invalidate(user_key(user_id))
+        await invalidate_current_user(user_id)
         
         return {"message": f"Пользователь с ID {user_id} удалён"}
             
     except IntegrityError as e:
-        db.rollback()
-        print("\033[33m DEBUG: \033[0m" + f"Ошибка целостности при удалении пользователя: {str(e)}")
+        await db.rollback()
+        logger.warning("Ошибка целостности при удалении пользователя с ID %s: %s", user_id, e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Database integrity error occurred"
         )
     except Exception as e:
-        db.rollback()
-        print("\033[33m DEBUG: \033[0m" + f"Ошибка при удалении пользователя: {str(e)}", exc_info=True)
+        await db.rollback()
+        logger.exception("Ошибка при удалении пользователя с ID %s", user_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -246,7 +298,7 @@ async def delete_user(
 @user_router.post("/token", status_code=status.HTTP_202_ACCEPTED)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Аутентификация пользователя по паролю
@@ -259,7 +311,7 @@ async def login_for_access_token(
         Сгенерированный токен в формате {"access_token", "token_type"}
     """
     
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await db.scalar(select(User).where(User.username == form_data.username))
     
     if not user:
         raise HTTPException(
@@ -269,7 +321,7 @@ async def login_for_access_token(
         )
     
     # Проверяем пароль
-    if not verify_password(form_data.password, user.password_hash):
+    if not await password_hasher.verify(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -279,7 +331,7 @@ async def login_for_access_token(
     # Создаем токен
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id}, expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
@@ -292,10 +344,10 @@ async def read_users_me(current_user: dict = Depends(get_current_active_user)):
 async def add_to_favorites(
     user_id: int, 
     recipe_id: int,
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_db), 
 ):
     # Проверяем существование пользователя
-    user = db.get(User, user_id)
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -303,34 +355,32 @@ async def add_to_favorites(
         )
     
     # Проверяем существование рецепта
-    recipe = db.get(Recipe, recipe_id)
+    recipe = await db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Recipe with id {recipe_id} not found"
         )
     
-    # Проверяем, не добавлен ли уже рецепт в избранное
-    existing = db.query(FavoriteRecipe).filter(
-        FavoriteRecipe.user_id == user_id,
-        FavoriteRecipe.recipe_id == recipe_id
-    ).first()
+    # Создаем новую запись; повторная вставка не пройдёт по первичному ключу
+    fav = (await db.execute(
+        pg_insert(FavoriteRecipe)
+        .values(user_id=user_id, recipe_id=recipe_id)
+        .on_conflict_do_nothing()
+        .returning(FavoriteRecipe.user_id, FavoriteRecipe.recipe_id, FavoriteRecipe.created_at)
+    )).first()
     
-    if existing:
+    if not fav:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Recipe already in favorites"
         )
-    fav = db.query(FavoriteRecipe).filter(FavoriteRecipe.user_id == user_id, FavoriteRecipe.recipe_id == recipe_id).first()
-    # Создаем новую запись
-    fav = FavoriteRecipe(user_id=user_id, recipe_id=recipe_id)
-    db.add(fav)
     
-    # Обновляем счетчик лайков
-    recipe.likes_count = (recipe.likes_count or 0) + 1
+    # Обновляем счетчик лайков атомарно, в той же транзакции
+    await likes_counter.add(db, recipe_id, 1)
     
-    db.commit()
-    db.refresh(fav)
+    await db.commit()
+    await cache.invalidate(recipe_key(recipe_id))
     
     return fav
 
@@ -338,10 +388,10 @@ async def add_to_favorites(
 async def delete_from_favorites(
     user_id: int, 
     recipe_id: int,
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_db), 
 ):
     # Проверяем существование пользователя
-    user = db.get(User, user_id)
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -349,74 +399,129 @@ async def delete_from_favorites(
         )
     
     # Проверяем существование рецепта
-    recipe = db.get(Recipe, recipe_id)
+    recipe = await db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Recipe with id {recipe_id} not found"
         )
     
-    # Проверяем наличие связи
-    existing = db.query(FavoriteRecipe).filter(
-        FavoriteRecipe.user_id == user_id,
-        FavoriteRecipe.recipe_id == recipe_id
-    ).first()
+    # Удаляем связь, если она есть
+    deleted = await db.scalar(
+        delete(FavoriteRecipe)
+        .where(FavoriteRecipe.user_id == user_id, FavoriteRecipe.recipe_id == recipe_id)
+        .returning(FavoriteRecipe.recipe_id)
+    )
     
-    if not existing:
-            print("\033[33m DEBUG: \033[0m" + f"Связь не найдена")
+    if deleted is None:
+            logger.debug("Связь не найдена")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Not in favorites"
             ) 
-    db.delete(existing)
-    db.commit()
     
-    # Обновляем счетчик лайков
-    recipe.likes_count = (recipe.likes_count or 0) - 1
+    # Обновляем счетчик лайков атомарно, в той же транзакции
+    await likes_counter.add(db, recipe_id, -1)
     
-    db.commit()
+    await db.commit()
+    await cache.invalidate(recipe_key(recipe_id))
     return {"message": f"Связь пользователя {user_id} с рецептом {recipe_id} удалена"}
 
 
 @user_router.get("/{user_id}/favorites", response_model=list[RecipeInDB])
 async def get_favorites(
     user_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: str = None,
 ):
-    favorites = db.query(FavoriteRecipe).filter(
-        FavoriteRecipe.user_id == user_id
-    ).offset(skip).limit(limit).all()
+    """
+    Получение избранных рецептов пользователя, от недавно добавленных к старым.
+
+    Рецепты выбираются одним запросом через JOIN, без подгрузки по одному
+    на каждую запись избранного.
+
+    Аргументы:
+        user_id: Идентификатор пользователя
+        skip: Сколько рецептов пропустить (устаревший способ, игнорируется при cursor)
+        limit: Сколько рецептов вернуть
+        cursor: Непрозрачный курсор keyset-пагинации
+        db: Сессия
+
+    Возвращает:
+        Список рецептов. Курсор следующей страницы передаётся в заголовке X-Next-Cursor.
+    """
+    query = paginate(
+        select(Recipe, FavoriteRecipe.created_at)
+        .join(FavoriteRecipe, FavoriteRecipe.recipe_id == Recipe.id)
+        .where(FavoriteRecipe.user_id == user_id),
+        FavoriteRecipe.created_at, FavoriteRecipe.recipe_id, cursor, skip, limit
+    )
+    rows = (await db.execute(query)).all()
+    set_next_cursor(response, [(favorited_at, recipe.id) for recipe, favorited_at in rows], limit)
     
-    return [fav.recipe for fav in favorites]
+    return [recipe for recipe, _ in rows]
 
 @user_router.get("/{user_id}/recipes", response_model=list[RecipeInDB])
 async def get_created(
     user_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: str = None,
 ):
-    created = db.query(Recipe).filter(
-        Recipe.author_id == user_id
-    ).offset(skip).limit(limit).all()
+    query = paginate(
+        select(Recipe).where(Recipe.author_id == user_id),
+        Recipe.created_at, Recipe.id, cursor, skip, limit
+    )
+    created = (await db.scalars(query)).all()
+    set_next_cursor(response, [(item.created_at, item.id) for item in created], limit)
     
-    return [item for item in created]
+    return created
+
+@user_router.get("/{user_id}/favorited", response_model=list[int])
+async def get_favorited_among(
+    user_id: int,
+    ids: list[int] = Query(..., description="Идентификаторы рецептов: ?ids=1&ids=2"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Какие из переданных рецептов есть в избранном пользователя.
+
+    Заменяет вызов get_is_in_user_favorites на каждую карточку: вся страница
+    проверяется одним запросом по первичному ключу (user_id, recipe_id).
+
+    Аргументы:
+        user_id: Идентификатор пользователя
+        ids: Идентификаторы рецептов (не больше FAVORITED_MAX_IDS)
+        db: Сессия
+
+    Возвращает:
+        Список ID рецептов из ids, которые есть в избранном
+    """
+    if len(ids) > FAVORITED_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Too many ids, maximum is {FAVORITED_MAX_IDS}")
+    return (await db.scalars(
+        select(FavoriteRecipe.recipe_id).where(
+            FavoriteRecipe.user_id == user_id,
+            FavoriteRecipe.recipe_id == any_(ids),
+        )
+    )).all()
+
 
 @user_router.get("/{user_id}/favorited/{recipe_id}", response_model=bool)
 async def get_is_in_user_favorites(
     user_id: int,
     recipe_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     ):
-    existing = db.query(FavoriteRecipe).filter(
-        FavoriteRecipe.user_id == user_id,
-        FavoriteRecipe.recipe_id == recipe_id
-    ).first()
+    existing = await db.get(FavoriteRecipe, (user_id, recipe_id))
     
     if not existing:
-        print("\033[33m DEBUG: \033[0m" + f"Связь не найдена")
+        logger.debug("Связь не найдена")
         return False
     else:
         return True
\ No newline at end of file
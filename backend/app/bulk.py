@@ -0,0 +1,295 @@
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import sys
+from collections import Counter
+from typing import AsyncIterator, Optional
+
+import aiofiles
+from pydantic import ValidationError
+from sqlalchemy import Select, insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.filters import apply_recipe_filters
+from app.database.base_recipe import RecipeBase, RecipeFilter, RecipeInDB
+from app.database.connection import SessionLocal
+from app.facets import apply_facet_delta, invalidate_facets, recipe_facets
+from app.models.recipe import Recipe
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+IMPORT_MAX_LINE_SIZE = 1024 * 1024  # 1MB на один рецепт
+READ_CHUNK_SIZE = 64 * 1024
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+IMAGE_URL_PREFIX = "/static/images/"
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+EXPORT_COLUMNS = list(RecipeInDB.model_fields)
+
+recipes_table = Recipe.__table__
+
+
+class ImportReport:
+    """
+    Итог импорта: число вставленных и отклонённых строк и ошибки по номерам строк.
+
+    Хранится не больше max_errors ошибок, чтобы память не росла на битых файлах.
+    """
+
+    def __init__(self, max_errors: int = IMPORT_MAX_ERRORS):
+        self.max_errors = max_errors
+        self.inserted = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def error(self, line: int, detail) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "detail": detail})
+
+    def as_dict(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], report: ImportReport) -> AsyncIterator[tuple[int, bytes]]:
+    """
+    Разбивает поток байтов на строки NDJSON, не держа в памяти больше одной строки.
+    """
+    buffer = b""
+    line_no = 0
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if skipping:
+                # Хвост слишком длинной строки
+                skipping = False
+                continue
+            yield line_no, line
+        if len(buffer) > IMPORT_MAX_LINE_SIZE:
+            if not skipping:
+                report.error(line_no + 1, "Line is too long")
+            buffer = b""
+            skipping = True
+    if buffer and not skipping:
+        yield line_no + 1, buffer
+
+
+def is_upload_url(url: str) -> bool:
+    """
+    Проверяет, что URL картинки указывает на файл прямо в static/images.
+
+    Путь из импорта потом попадает в discard_if_unused, поэтому ".." и
+    вложенные каталоги не пропускаются.
+    """
+    if not url.startswith(IMAGE_URL_PREFIX):
+        return False
+    name = url[len(IMAGE_URL_PREFIX):]
+    return name not in ("", ".", "..") and "/" not in name and "\\" not in name
+
+
+def _row_facets(row: dict) -> Counter:
+    return recipe_facets(row["tags"], row["difficulty"], row["cooking_time_minutes"])
+
+
+async def _insert_batch(db: AsyncSession, batch: list[tuple[int, dict]], report: ImportReport) -> None:
+    """
+    Вставляет пачку одним executemany. Если пачка не прошла целиком,
+    строки повторяются по одной, чтобы указать, какая именно сломалась.
+    """
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(recipes_table), [row for _, row in batch])
+            await apply_facet_delta(db, sum((_row_facets(row) for _, row in batch), Counter()))
+        report.inserted += len(batch)
+    except DBAPIError:
+        for line_no, row in batch:
+            try:
+                async with db.begin_nested():
+                    await db.execute(insert(recipes_table), [row])
+                    await apply_facet_delta(db, _row_facets(row))
+                report.inserted += 1
+            except DBAPIError as e:
+                report.error(line_no, str(e.orig))
+    await db.commit()
+    await invalidate_facets()
+
+
+async def import_recipes(
+    db: AsyncSession,
+    chunks: AsyncIterator[bytes],
+    author_id: Optional[int] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    max_errors: int = IMPORT_MAX_ERRORS,
+) -> ImportReport:
+    """
+    Импорт рецептов из потока NDJSON: одна строка — один объект RecipeBase.
+
+    Аргументы:
+        db: Сессия
+        chunks: Асинхронный поток байтов (тело запроса или файл)
+        author_id: Если задан, все рецепты должны принадлежать этому автору
+        batch_size: Сколько строк вставлять за один запрос
+        max_errors: Сколько ошибок сохранять в отчёте
+
+    Возвращает:
+        ImportReport
+    """
+    report = ImportReport(max_errors)
+    batch: list[tuple[int, dict]] = []
+    async for line_no, line in iter_lines(chunks, report):
+        if not line.strip():
+            continue
+        try:
+            recipe = RecipeBase.model_validate_json(line)
+        except ValidationError as e:
+            report.error(line_no, e.errors(include_url=False, include_input=False))
+            continue
+        if author_id is not None and recipe.author_id != author_id:
+            report.error(line_no, "Cannot create a recipe using other user as author")
+            continue
+        if recipe.image is not None and not is_upload_url(recipe.image):
+            report.error(line_no, "Invalid image path")
+            continue
+        batch.append((line_no, recipe.model_dump()))
+        if len(batch) >= batch_size:
+            await _insert_batch(db, batch, report)
+            batch = []
+    if batch:
+        await _insert_batch(db, batch, report)
+    return report
+
+
+def _csv_row(recipe: dict) -> list:
+    # Списки и словари в CSV пишутся JSON-строками, чтобы их можно было разобрать обратно
+    return [
+        json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+        for value in (recipe[column] for column in EXPORT_COLUMNS)
+    ]
+
+
+async def export_recipes(
+    db: AsyncSession,
+    query: Optional[Select] = None,
+    format: str = "ndjson",
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Потоковая выгрузка рецептов в NDJSON или CSV.
+
+    Строки читаются серверным курсором пачками по batch_size, и каждая пачка
+    сразу отдаётся наружу, так что память не зависит от размера таблицы.
+
+    Аргументы:
+        db: Сессия (должна жить, пока читается поток)
+        query: Запрос select(Recipe) с фильтрами; по умолчанию — вся таблица
+        format: "ndjson" или "csv"
+        batch_size: Сколько строк забирать из курсора за раз
+
+    Возвращает:
+        Асинхронный поток байтов
+    """
+    if query is None:
+        query = select(Recipe)
+    # Порядок по первичному ключу: выгрузка воспроизводима и идёт по индексу
+    query = query.order_by(Recipe.id).execution_options(yield_per=batch_size)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if format == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+
+    result = await db.stream_scalars(query)
+    async for recipes in result.partitions():
+        for recipe in recipes:
+            data = RecipeInDB.model_validate(recipe)
+            if format == "csv":
+                writer.writerow(_csv_row(data.model_dump(mode="json")))
+            else:
+                buffer.write(data.model_dump_json())
+                buffer.write("\n")
+        # Объекты пачки больше не нужны — не даём identity map расти
+        db.expunge_all()
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Пустая выгрузка: в CSV остаётся только заголовок
+        yield buffer.getvalue().encode()
+
+
+async def read_file(path: str) -> AsyncIterator[bytes]:
+    if path == "-":
+        while chunk := await asyncio.to_thread(sys.stdin.buffer.read, READ_CHUNK_SIZE):
+            yield chunk
+        return
+    async with aiofiles.open(path, "rb") as file:
+        while chunk := await file.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+async def run_import(args) -> None:
+    async with SessionLocal() as db:
+        report = await import_recipes(db, read_file(args.path), batch_size=args.batch_size)
+    print(json.dumps(report.as_dict(), ensure_ascii=False, indent=2))
+
+
+async def run_export(args) -> None:
+    filters = RecipeFilter(
+        tags=args.tag,
+        max_cooking_time=args.max_cooking_time,
+        min_cooking_time=args.min_cooking_time,
+        difficulty=args.difficulty,
+        ingredients=args.ingredient,
+    )
+    query = apply_recipe_filters(select(Recipe), filters)
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        async with SessionLocal() as db:
+            async for chunk in export_recipes(db, query, args.format, args.batch_size):
+                await asyncio.to_thread(output.write, chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.bulk", description="Массовые операции с рецептами")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="импорт рецептов из NDJSON")
+    import_parser.add_argument("path", help="путь к файлу NDJSON или - для stdin")
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    import_parser.set_defaults(handler=run_import)
+
+    export_parser = commands.add_parser("export", help="выгрузка рецептов в NDJSON или CSV")
+    export_parser.add_argument("output", nargs="?", default="-", help="путь к файлу или - для stdout")
+    export_parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+    export_parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    export_parser.add_argument("--tag", action="append", help="фильтр по тегу (можно повторять)")
+    export_parser.add_argument("--ingredient", action="append", help="фильтр по ингредиенту (можно повторять)")
+    export_parser.add_argument("--max-cooking-time", type=int)
+    export_parser.add_argument("--min-cooking-time", type=int)
+    export_parser.add_argument("--difficulty", type=int, choices=range(1, 6))
+    export_parser.set_defaults(handler=run_export)
+
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # memory | redis
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+# Через сколько секунд после invalidate ключи удаляются ещё раз (см. Cache)
+CACHE_REINVALIDATE_SECONDS = float(os.getenv("CACHE_REINVALIDATE_SECONDS", "2"))
+
+
+class MemoryBackend:
+    """
+    LRU-кеш в памяти процесса с временем жизни записей.
+
+    Инвалидация видна только внутри своего воркера, поэтому при нескольких
+    воркерах устаревание ограничено TTL. Для общего кеша используйте RedisBackend.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: int = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+
+class RedisBackend:
+    """
+    Кеш в Redis (или любом совместимом сервере), общий для всех воркеров.
+
+    Принимает асинхронный клиент с методами get/set(ex=)/delete,
+    например redis.asyncio.Redis или локальную заглушку с тем же интерфейсом.
+    """
+
+    def __init__(self, client, ttl: int = CACHE_TTL_SECONDS, prefix: str = "recipespace:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisBackend":
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis требует установленный пакет redis")
+        return cls(redis.from_url(url), **kwargs)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+
+class Cache:
+    """
+    Read-through кеш сериализованных ответов со счётчиками попаданий и промахов.
+
+    Читатель, начавший читать из БД до коммита изменения, может положить в кеш
+    старую версию уже после invalidate. Поэтому через reinvalidate_after секунд
+    после invalidate ключи удаляются ещё раз: старая версия живёт в кеше не дольше
+    этой задержки, а не весь TTL. При чтении с реплик задержка не меньше их
+    допустимого отставания — отстающая реплика отдаёт старую версию дольше.
+    """
+
+    def __init__(self, backend, reinvalidate_after: float = CACHE_REINVALIDATE_SECONDS):
+        self.backend = backend
+        self.reinvalidate_after = reinvalidate_after
+        self._pending: set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.backend.set(key, value)
+
+    async def invalidate(self, *keys: str) -> None:
+        await self.backend.delete(*keys)
+        if self.reinvalidate_after and keys:
+            task = asyncio.create_task(self._delete_later(keys))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _delete_later(self, keys: tuple[str, ...]) -> None:
+        await asyncio.sleep(self.reinvalidate_after)
+        await self.backend.delete(*keys)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+def recipe_key(recipe_id: int) -> str:
+    return f"recipe:{recipe_id}"
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def current_user_key(user_id: int) -> str:
+    return f"current-user:{user_id}"
+
+
+def facets_key(generation: str, filters_json: str, tag_limit: int) -> str:
+    return f"facets:{generation}:{tag_limit}:{filters_json}"
+
+
+def primary_pin_key(token: str) -> str:
+    # Сам токен в ключ не попадает — только его хеш
+    return "primary-pin:" + hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+def create_backend(ttl: int = CACHE_TTL_SECONDS, max_entries: int = CACHE_MAX_ENTRIES):
+    # max_entries ограничивает только кеш в памяти: у Redis свои лимиты (maxmemory)
+    if CACHE_BACKEND == "redis":
+        return RedisBackend.from_url(CACHE_URL, ttl=ttl)
+    return MemoryBackend(max_entries=max_entries, ttl=ttl)
+
+
+cache = Cache(create_backend())
@@ -0,0 +1,115 @@
+import os
+from typing import Iterable, Optional
+
+import brotli
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# На странице из 100 рецептов (benchmarks.serialization) br с quality 4–6 выходит
+# больше gzip 6; с 7 — меньше него и всё ещё быстрее
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "7"))
+# При равных весах в Accept-Encoding выбирается первая
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+
+def parse_accept_encoding(value: str) -> dict[str, float]:
+    """
+    Кодировки из заголовка Accept-Encoding с их весами q.
+
+    Аргументы:
+        value: Значение заголовка, например "gzip, br;q=0.8, *;q=0"
+
+    Возвращает:
+        {кодировка в нижнем регистре: вес}; без q вес 1, некорректный q — 0
+    """
+    codings = {}
+    for part in value.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, param_value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(param_value)
+                except ValueError:
+                    weight = 0.0
+        codings[coding] = weight
+    return codings
+
+
+def choose_encoding(accept_encoding: str, available: Iterable[str] = SUPPORTED_ENCODINGS) -> Optional[str]:
+    """
+    Кодировка для ответа: доступная с наибольшим положительным весом,
+    или None — отдавать без сжатия. "*" задаёт вес не перечисленных кодировок.
+
+    Аргументы:
+        accept_encoding: Значение заголовка Accept-Encoding
+        available: Кодировки, которые можно отдать, в порядке предпочтения
+    """
+    codings = parse_accept_encoding(accept_encoding)
+    default = codings.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for coding in available:
+        weight = codings.get(coding, default)
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = BROTLI_QUALITY) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        body = self.compressor.process(body)
+        if more_body:
+            return body + self.compressor.flush()
+        return body + self.compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Сжатие ответов br или gzip, в зависимости от Accept-Encoding клиента.
+
+    Ответы меньше minimum_size отдаются как есть: на маленьких телах сжатие
+    стоит дороже, чем экономит. Пути из excluded_prefixes (статика со своими
+    .br/.gz копиями и уже сжатыми картинками) пропускаются без изменений.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+        excluded_prefixes: tuple[str, ...] = ("/static",),
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_prefixes = excluded_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.excluded_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, quality=self.brotli_quality)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            await self.app(scope, receive, send)
+            return
+        await responder(scope, receive, send)
@@ -1,9 +1,20 @@
 from datetime import datetime
-from typing import List, Optional
-from fastapi import Form
-from pydantic import BaseModel
+from typing import Dict, List, Optional
+from fastapi import Form, Query
+from pydantic import BaseModel, field_validator
 import json
 
+
+def normalize_terms(values: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Приводит теги/ингредиенты к виду, в котором они хранятся в БД:
+    нижний регистр, без пробелов по краям, без пустых значений и дублей.
+    """
+    if values is None:
+        return None
+    return list(dict.fromkeys(v.strip().lower() for v in values if v and v.strip()))
+
+
 class RecipeBase(BaseModel):
     title: str
     description: Optional[str] = None
@@ -14,6 +25,11 @@ class RecipeBase(BaseModel):
     image: Optional[str] = None
     steps: str
     author_id: int
+
+    @field_validator("tags", "ingredients")
+    @classmethod
+    def normalize_lists(cls, values):
+        return normalize_terms(values)
     
     
 
@@ -58,6 +74,11 @@ class RecipeUpdate(BaseModel):
     difficulty: Optional[int] = None
     steps: Optional[str] = None
 
+    @field_validator("tags", "ingredients")
+    @classmethod
+    def normalize_lists(cls, values):
+        return normalize_terms(values)
+
     @classmethod
     def as_form(
         cls,
@@ -84,21 +105,62 @@ class RecipeUpdate(BaseModel):
         )
 
 class RecipeFilter(BaseModel):
-    skip: int
-    limit: int
-    tags: list[str]
-    max_cooking_time: int
-    min_cooking_time: int
-    difficulty: int
-    ingredients: list[str]
+    tags: Optional[List[str]] = None
+    max_cooking_time: Optional[int] = None
+    min_cooking_time: Optional[int] = None
+    difficulty: Optional[int] = None
+    ingredients: Optional[List[str]] = None
+
+    @field_validator("tags", "ingredients")
+    @classmethod
+    def normalize_lists(cls, values):
+        # Значения в БД нормализованы при записи, поэтому сравниваем напрямую —
+        # так операторы && и @> используют GIN-индексы
+        return normalize_terms(values)
+
+    @classmethod
+    def as_query(
+        cls,
+        tags: List[str] = Query(None, description="Фильтрация по тегам"),
+        max_cooking_time: int = Query(None, ge=1, description="Максимальное время приготовления в минутах"),
+        min_cooking_time: int = Query(None, ge=1, description="Минимальное время приготовления в минутах"),
+        difficulty: int = Query(None, ge=1, le=5, description="Уровень сложности (1-5)"),
+        ingredients: List[str] = Query(None, description="Фильтрация по ингредиентам"),
+    ):
+        return cls(
+            tags=tags,
+            max_cooking_time=max_cooking_time,
+            min_cooking_time=min_cooking_time,
+            difficulty=difficulty,
+            ingredients=ingredients,
+        )
 
 
 
 class RecipeInDB(RecipeBase):
     id: int
+    image_variants: Optional[Dict[str, str]] = None
     likes_count: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class RecipeListItem(RecipeInDB):
+    # Только в списке рецептов: зависит от пользователя, поэтому не попадает
+    # ни в кеш карточек, ни в выгрузку
+    is_favorited: Optional[bool] = None  # Заполняется только для вошедшего пользователя
+
+
+class RecipeBatch(BaseModel):
+    recipes: List[RecipeInDB]  # В порядке запрошенных ID
+    missing: List[int]  # ID, которых нет в БД
+
+
+class RecipeFacets(BaseModel):
+    total: int  # Сколько рецептов подходит под все фильтры
+    tags: Dict[str, int]  # Самые частые теги, по убыванию
+    difficulty: Dict[int, int]
+    cooking_time: Dict[str, int]  # Диапазоны "0-15", "16-30", ... в минутах
@@ -1,6 +1,6 @@
 from fastapi import Form
 from pydantic import BaseModel, EmailStr, Field, StringConstraints
-from typing import Annotated, Optional
+from typing import Annotated, Dict, Optional
 from datetime import datetime
 from typing import List
 
@@ -39,6 +39,7 @@ class UserInDB(UserBase):
     id: int
     bio: Optional[str] = None
     profile_picture: Optional[str] = None
+    profile_picture_variants: Optional[Dict[str, str]] = None
     is_active: bool = True
     created_at: datetime
     updated_at: Optional[datetime] = None
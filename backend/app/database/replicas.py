@@ -0,0 +1,262 @@
+import asyncio
+import itertools
+import logging
+import math
+import time
+from typing import Optional
+
+import asyncpg
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.cache import create_backend, primary_pin_key
+from app.database import connection
+from app.database.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Методы, которые ничего не меняют: после них пользователя не нужно закреплять за основной БД
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def bearer_token(headers) -> Optional[str]:
+    authorization = headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
+class Replica:
+    def __init__(self, index: int, url: str):
+        self.index = index
+        self.url = make_url(url)
+        self.down_until = 0.0
+        self.connections = 0
+        self.failures = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "replica": self.index,
+            "healthy": self.healthy,
+            "connections": self.connections,
+            "failures": self.failures,
+        }
+
+
+class ReplicaRouter:
+    """
+    Распределяет чтения между репликами.
+
+    У всех реплик один пул: реплика выбирается, когда пул открывает новое
+    соединение, — по кругу среди здоровых. Сессия из get_read_db подключается
+    лениво, при первом запросе, поэтому ответ из кеша не занимает соединение
+    реплики. Если реплика не отвечает при подключении или соединение с ней
+    оборвалось, она пропускается retry_seconds секунд; если недоступны все,
+    соединение открывается к основной БД и выбрасывается из пула, как только
+    какая-нибудь реплика снова считается здоровой.
+
+    Токены, закреплённые после записи (read-your-writes), читают с основной БД.
+    Закрепления хранятся в том же хранилище, что и кеш (CACHE_BACKEND):
+    при нескольких воркерах нужен redis, иначе закрепление видно только
+    воркеру, который обработал запись.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        retry_seconds: float = settings.replica_retry_seconds,
+        read_your_writes_seconds: float = settings.read_your_writes_seconds,
+        connect_timeout: float = settings.replica_connect_timeout,
+    ):
+        self.replicas = [Replica(index, url) for index, url in enumerate(urls)]
+        self.retry_seconds = retry_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.connect_timeout = connect_timeout
+        self._order = itertools.count()
+        self.pins = create_backend(ttl=max(1, math.ceil(read_your_writes_seconds))) if read_your_writes_seconds else None
+        self.primary_connections = 0
+        self.pinned_reads = 0
+        # id соединения драйвера -> индекс реплики (None — основная БД), до события connect пула
+        self._origins: dict[int, Optional[int]] = {}
+        self.engine = None
+        self.session_factory = None
+        if self.replicas:
+            self._create_engine()
+
+    def _create_engine(self) -> None:
+        options = settings.engine_options()
+        connect_args = options.pop("connect_args")
+        # Эти аргументы принимает обёртка диалекта, а не asyncpg.connect
+        adapter_args = {
+            key: connect_args.pop(key)
+            for key in ("prepared_statement_cache_size", "prepared_statement_name_func")
+            if key in connect_args
+        }
+        self._connect_args = connect_args
+
+        def creator():
+            # Как async_creator в create_async_engine, но с аргументами обёртки диалекта
+            return self.engine.sync_engine.dialect.dbapi.connect(async_creator_fn=self._connect, **adapter_args)
+
+        self.engine = create_async_engine(self.replicas[0].url, creator=creator, **options)
+        self.session_factory = async_sessionmaker(
+            self.engine, class_=AsyncSession, autoflush=False, expire_on_commit=False,
+        )
+        dialect = self.engine.sync_engine.dialect
+        self._params = [dialect.create_connect_args(replica.url)[1] for replica in self.replicas]
+        self._primary_params = dialect.create_connect_args(make_url(settings.async_url))[1]
+
+        sync_engine = self.engine.sync_engine
+        event.listen(sync_engine, "connect", self._remember_origin)
+        event.listen(sync_engine, "checkout", self._check_origin)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+
+    @property
+    def engines(self) -> list:
+        return [self.engine] if self.engine is not None else []
+
+    def candidates(self) -> list[Replica]:
+        """Здоровые реплики, начиная со следующей по кругу."""
+        start = next(self._order) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.healthy]
+
+    def mark_down(self, replica: Replica, error: BaseException) -> None:
+        replica.failures += 1
+        replica.down_until = time.monotonic() + self.retry_seconds
+        logger.warning(
+            "Реплика %d недоступна, чтение переключено на другие на %.0f с: %s",
+            replica.index, self.retry_seconds, error,
+        )
+
+    async def _connect(self):
+        """Новое соединение драйвера: здоровая реплика по кругу, в крайнем случае основная БД."""
+        for replica in self.candidates():
+            try:
+                connection = await asyncpg.connect(
+                    **self._params[replica.index], **self._connect_args, timeout=self.connect_timeout,
+                )
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as error:
+                self.mark_down(replica, error)
+                continue
+            replica.connections += 1
+            self._origins[id(connection)] = replica.index
+            return connection
+
+        self.primary_connections += 1
+        connection = await asyncpg.connect(**self._primary_params, **self._connect_args)
+        self._origins[id(connection)] = None
+        return connection
+
+    def _remember_origin(self, dbapi_connection, connection_record) -> None:
+        connection_record.info["replica"] = self._origins.pop(id(dbapi_connection.driver_connection), None)
+
+    def _check_origin(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        index = connection_record.info.get("replica")
+        if index is None:
+            stale = any(replica.healthy for replica in self.replicas)
+        else:
+            stale = not self.replicas[index].healthy
+        if stale:
+            # Пул закроет это соединение и откроет новое через _connect
+            raise DisconnectionError("соединение ведёт не на ту базу, которую сейчас выбрал бы роутер")
+
+    def _handle_error(self, context) -> None:
+        if not context.is_disconnect or context.connection is None:
+            return
+        index = context.connection.info.get("replica")
+        if index is not None:
+            self.mark_down(self.replicas[index], context.original_exception)
+
+    async def pin(self, token: str) -> None:
+        if self.pins is not None:
+            await self.pins.set(primary_pin_key(token), b"1")
+
+    async def is_pinned(self, token: Optional[str]) -> bool:
+        if self.pins is None or token is None:
+            return False
+        return await self.pins.get(primary_pin_key(token)) is not None
+
+    async def open_session(self, token: Optional[str]) -> AsyncSession:
+        """
+        Сессия для чтения. Соединение не открывается, пока сессия не выполнит запрос.
+
+        Аргументы:
+            token: Bearer-токен запроса — для проверки закрепления после записи
+
+        Возвращает:
+            AsyncSession пула реплик или, для закреплённого токена, основной БД
+        """
+        if await self.is_pinned(token):
+            self.pinned_reads += 1
+            return connection.SessionLocal()
+        return self.session_factory()
+
+    def stats(self) -> dict:
+        pool = self.engine.pool
+        return {
+            "replicas": [replica.stats() for replica in self.replicas],
+            "pool": pool.stats() if hasattr(pool, "stats") else type(pool).__name__,
+            "primary_connections": self.primary_connections,
+            "pinned_reads": self.pinned_reads,
+            "read_your_writes_seconds": self.read_your_writes_seconds,
+        }
+
+    async def dispose(self) -> None:
+        if self.engine is not None:
+            await self.engine.dispose()
+
+
+replica_router = ReplicaRouter(settings.replica_async_urls)
+
+
+async def get_read_db(request: Request):
+    """
+    Сессия для эндпоинтов, которые только читают. Без настроенных реплик
+    (DB_REPLICA_URLS) это та же сессия основной БД, что и у get_db.
+    """
+    if not replica_router.replicas:
+        async with connection.SessionLocal() as db:
+            yield db
+        return
+    async with await replica_router.open_session(bearer_token(request.headers)) as db:
+        yield db
+
+
+class ReadYourWritesMiddleware:
+    """
+    После успешного изменяющего запроса (POST, PATCH, DELETE, ... со статусом
+    меньше 400) закрепляет его Bearer-токен за основной БД на
+    read_your_writes_seconds: следующие чтения того же пользователя не попадут
+    на реплику, которая ещё не получила его изменения.
+    """
+
+    def __init__(self, app: ASGIApp, router: ReplicaRouter = replica_router) -> None:
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        token = bearer_token(Headers(scope=scope))
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            # Закрепляем до отправки ответа: клиент не успеет прочитать с реплики раньше
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                await self.router.pin(token)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
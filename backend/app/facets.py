@@ -0,0 +1,229 @@
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Iterable, Optional
+
+from sqlalchemy import String, case, cast, delete, func, insert, literal, literal_column, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.filters import apply_recipe_filters
+from app.cache import Cache, create_backend
+from app.database.base_recipe import RecipeFilter
+from app.database.connection import SessionLocal
+from app.models.facet import RecipeFacetCount
+from app.models.recipe import Recipe
+
+# Диапазоны времени приготовления: (метка, от, до) включительно,
+# чтобы выбор диапазона напрямую переводился в min/max_cooking_time
+COOKING_TIME_BUCKETS: tuple[tuple[str, Optional[int], Optional[int]], ...] = (
+    ("0-15", None, 15),
+    ("16-30", 16, 30),
+    ("31-60", 31, 60),
+    ("61-120", 61, 120),
+    ("121+", 121, None),
+)
+DIFFICULTY_LEVELS = range(1, 6)
+TAG_FACET_LIMIT = 50
+
+# Поля RecipeFilter, относящиеся к каждому фасету. Счётчики фасета считаются
+# без его собственного фильтра, чтобы в списке были видны и соседние значения
+FACET_FILTER_FIELDS = {
+    "total": (),
+    "tag": ("tags",),
+    "difficulty": ("difficulty",),
+    "cooking_time": ("min_cooking_time", "max_cooking_time"),
+}
+
+facets_table = RecipeFacetCount.__table__
+
+# Ответы с фильтрами кешируются отдельно от рецептов и пользователей: набор
+# фильтров выбирает клиент, и такие записи не должны вытеснять горячие ключи
+FACETS_CACHE_TTL_SECONDS = int(os.getenv("FACETS_CACHE_TTL_SECONDS", "30"))
+FACETS_CACHE_MAX_ENTRIES = int(os.getenv("FACETS_CACHE_MAX_ENTRIES", "1000"))
+FACETS_GENERATION_KEY = "facets-generation"
+# Старые ответы перестают читаться сменой поколения, повторное удаление не нужно
+facets_cache = Cache(
+    create_backend(ttl=FACETS_CACHE_TTL_SECONDS, max_entries=FACETS_CACHE_MAX_ENTRIES),
+    reinvalidate_after=0,
+)
+
+
+def cooking_time_bucket(minutes: int) -> str:
+    for label, low, high in COOKING_TIME_BUCKETS:
+        if (low is None or minutes >= low) and (high is None or minutes <= high):
+            return label
+    return COOKING_TIME_BUCKETS[-1][0]
+
+
+def recipe_facets(tags: Iterable[str], difficulty: int, cooking_time_minutes: int) -> Counter:
+    """
+    Вклад одного рецепта в счётчики: {(фасет, значение): 1}.
+    """
+    facets = Counter({("total", ""): 1})
+    facets.update(("tag", tag) for tag in set(tags or ()))
+    facets[("difficulty", str(difficulty))] += 1
+    facets[("cooking_time", cooking_time_bucket(cooking_time_minutes))] += 1
+    return facets
+
+
+def facets_of(recipe: Recipe) -> Counter:
+    return recipe_facets(recipe.tags, recipe.difficulty, recipe.cooking_time_minutes)
+
+
+def facet_delta(old: Optional[Counter] = None, new: Optional[Counter] = None) -> Counter:
+    """
+    Разница счётчиков при изменении рецепта (old=None — создание, new=None — удаление).
+    """
+    delta = Counter(new or {})
+    delta.subtract(old or {})
+    return delta
+
+
+async def apply_facet_delta(db: AsyncSession, delta: Counter) -> None:
+    """
+    Применяет дельту одним INSERT ... ON CONFLICT DO UPDATE в транзакции вызывающего.
+
+    Строки сортируются по ключу — одинаковый порядок блокировок во всех воркерах.
+    """
+    rows = [
+        {"facet": facet, "value": value, "recipes_count": count}
+        for (facet, value), count in sorted(delta.items())
+        if count
+    ]
+    if not rows:
+        return
+    stmt = pg_insert(facets_table).values(rows)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[facets_table.c.facet, facets_table.c.value],
+            set_={"recipes_count": facets_table.c.recipes_count + stmt.excluded.recipes_count},
+        )
+    )
+
+
+async def facets_generation() -> str:
+    """
+    Текущее поколение кеша фасетов, входит в ключ каждого ответа.
+    """
+    generation = await facets_cache.backend.get(FACETS_GENERATION_KEY)
+    if generation is None:
+        return "0"
+    return generation.decode() if isinstance(generation, bytes) else generation
+
+
+async def invalidate_facets() -> None:
+    """
+    Сбрасывает кешированные ответы с фильтрами после коммита изменения рецептов.
+
+    Поколение не повторяется (время в наносекундах), поэтому и после истечения
+    его TTL старые ответы не станут снова видны: они старше самого ключа поколения.
+    """
+    await facets_cache.backend.set(FACETS_GENERATION_KEY, str(time.time_ns()).encode())
+
+
+def _cooking_time_case():
+    return case(
+        *[
+            (Recipe.cooking_time_minutes <= high, label)
+            for label, _, high in COOKING_TIME_BUCKETS
+            if high is not None
+        ],
+        else_=COOKING_TIME_BUCKETS[-1][0],
+    )
+
+
+def _live_query(facet: str, filters: RecipeFilter):
+    """
+    Запрос (значение, количество) по самим рецептам — для выборок с фильтрами.
+    """
+    if facet == "total":
+        query = select(literal("").label("value"), func.count().label("recipes_count")).select_from(Recipe)
+        return apply_recipe_filters(query, filters)
+    if facet == "tag":
+        # Теги рецепта не повторяются (normalize_terms, миграция c3e9f1a7b2d4),
+        # поэтому строка unnest — это ровно один рецепт
+        value = func.unnest(Recipe.tags)
+    elif facet == "difficulty":
+        value = cast(Recipe.difficulty, String)
+    else:
+        value = _cooking_time_case()
+    query = select(value.label("value"), func.count().label("recipes_count")).select_from(Recipe)
+    # GROUP BY по имени выходного столбца, а не повтором выражения:
+    # у CASE с параметрами и unnest() повтор не всегда совпадает с SELECT
+    return apply_recipe_filters(query, filters).group_by(literal_column("value"))
+
+
+async def facet_counts(db: AsyncSession, filters: RecipeFilter, tag_limit: int = TAG_FACET_LIMIT) -> dict:
+    """
+    Количество рецептов по тегам, сложности и диапазонам времени с учётом фильтров.
+
+    Если для фасета не осталось других фильтров, счётчики читаются из
+    recipe_facet_counts. Иначе они считаются по рецептам, отобранным
+    фильтрами (по GIN- и B-tree индексам из apply_recipe_filters).
+
+    Аргументы:
+        db: Сессия
+        filters: Текущие фильтры из боковой панели
+        tag_limit: Сколько самых частых тегов вернуть
+
+    Возвращает:
+        {"total": Число, "tags": {тег: Число}, "difficulty": {уровень: Число}, "cooking_time": {диапазон: Число}}
+    """
+    counts: dict[str, dict[str, int]] = {}
+    for facet, own_fields in FACET_FILTER_FIELDS.items():
+        other = filters.model_copy(update=dict.fromkeys(own_fields))
+        if any(other.model_dump().values()):
+            query = _live_query(facet, other)
+            count_column = query.selected_columns.recipes_count
+        else:
+            query = (
+                select(facets_table.c.value, facets_table.c.recipes_count)
+                .where(facets_table.c.facet == facet, facets_table.c.recipes_count > 0)
+            )
+            count_column = facets_table.c.recipes_count
+        if facet == "tag":
+            query = query.order_by(count_column.desc()).limit(tag_limit)
+        counts[facet] = {value: count for value, count in (await db.execute(query)).all()}
+
+    return {
+        "total": counts["total"].get("", 0),
+        "tags": counts["tag"],
+        "difficulty": {level: counts["difficulty"].get(str(level), 0) for level in DIFFICULTY_LEVELS},
+        "cooking_time": {label: counts["cooking_time"].get(label, 0) for label, _, _ in COOKING_TIME_BUCKETS},
+    }
+
+
+async def rebuild_facets(db: AsyncSession) -> int:
+    """
+    Полностью пересчитывает recipe_facet_counts по таблице recipes.
+
+    Нужен после ручных правок в БД или чтобы проверить дрейф счётчиков.
+
+    Возвращает:
+        Число записанных строк
+    """
+    no_filters = RecipeFilter()
+    live = union_all(*[
+        select(literal(facet).label("facet"), sub.c.value, sub.c.recipes_count)
+        for facet in FACET_FILTER_FIELDS
+        for sub in [_live_query(facet, no_filters).subquery()]
+    ])
+    await db.execute(delete(facets_table))
+    result = await db.execute(
+        insert(facets_table).from_select(["facet", "value", "recipes_count"], live)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def main() -> None:
+    async with SessionLocal() as db:
+        rows = await rebuild_facets(db)
+    print(f"Пересчитано счётчиков фильтров: {rows}")
+
+
+if __name__ == "__main__":
+    # python -m app.facets — полный пересчёт, например после ручного импорта в БД
+    asyncio.run(main())
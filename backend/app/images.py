@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+
+# Производные изображения: имя варианта -> максимальная сторона в пикселях
+# (None — исходный размер, только перекодирование в WebP)
+IMAGE_VARIANTS: dict[str, Optional[int]] = {
+    "thumb": 320,
+    "medium": 960,
+    "webp": None,
+}
+
+logger = logging.getLogger(__name__)
+
+# Каталоги загруженных файлов: пути из БД разрешено удалять только внутри них
+UPLOAD_DIRS = ("static/images", "static/avatars")
+
+
+def variant_path(source_path: str, variant: str) -> str:
+    """
+    Путь файла варианта рядом с исходным: static/images/<имя>_<вариант>.webp
+    """
+    stem, _ = os.path.splitext(source_path)
+    return f"{stem}_{variant}.webp"
+
+
+def generate_variants(source_path: str) -> dict[str, str]:
+    """
+    Создаёт WebP-варианты изображения. Выполняется в отдельном процессе.
+
+    Аргументы:
+        source_path: Путь к исходному файлу на диске
+
+    Возвращает:
+        Словарь {вариант: путь к файлу на диске}
+    """
+    from PIL import Image, ImageOps
+
+    # Файлы хранятся по хешу содержимого, поэтому готовые варианты можно переиспользовать
+    result = {variant: variant_path(source_path, variant) for variant in IMAGE_VARIANTS}
+    if all(os.path.exists(path) for path in result.values()):
+        return result
+
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        for variant, max_side in IMAGE_VARIANTS.items():
+            resized = image.copy()
+            if max_side is not None:
+                resized.thumbnail((max_side, max_side), Image.LANCZOS)
+            _save_atomically(resized, result[variant])
+    return result
+
+
+def _save_atomically(image, path: str) -> None:
+    """
+    Сохраняет WebP через временный файл в том же каталоге и os.replace:
+    недописанный файл никогда не лежит по итоговому пути и не считается готовым.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            image.save(file, "WEBP", quality=WEBP_QUALITY, method=4)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def url_for(path: str) -> str:
+    """
+    Переводит путь на диске (static/...) в URL (/static/...).
+    """
+    return "/" + path.replace(os.sep, "/")
+
+
+def upload_path(url: str) -> Optional[str]:
+    """
+    Путь на диске для URL загруженного файла ("/static/images/<имя>").
+
+    Возвращает:
+        Путь или None, если URL после разрешения ".." и символических ссылок
+        указывает не на файл прямо в одном из UPLOAD_DIRS
+    """
+    path = os.path.realpath(url.lstrip("/"))
+    if any(os.path.dirname(path) == os.path.realpath(directory) for directory in UPLOAD_DIRS):
+        return path
+    return None
+
+
+def remove_upload(url: str) -> None:
+    """
+    Удаляет загруженный файл по его URL. URL вне каталогов загрузок не трогает.
+    """
+    path = upload_path(url)
+    if path is None:
+        logger.warning("Отказ удалять файл вне каталогов загрузок: %r", url)
+        return
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+def remove_variants(variants: Optional[dict]) -> None:
+    """
+    Удаляет файлы вариантов по их URL.
+    """
+    for url in (variants or {}).values():
+        remove_upload(url)
+
+
+class ImageProcessor:
+    """
+    Пул процессов для обработки загруженных изображений вне обработчика запроса.
+    """
+
+    def __init__(self, max_workers: int = IMAGE_WORKERS):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def variants(self, source_path: str) -> Optional[dict[str, str]]:
+        """
+        Возвращает {вариант: URL} или None, если обработать изображение не удалось.
+        """
+        try:
+            paths = await asyncio.get_running_loop().run_in_executor(
+                self.executor, generate_variants, source_path
+            )
+        except Exception:
+            logger.exception("Не удалось создать варианты изображения %s", source_path)
+            return None
+        return {variant: url_for(path) for variant, path in paths.items()}
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+image_processor = ImageProcessor()
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import cache, recipe_key
+from app.database.connection import SessionLocal
+from app.models.fave import FavoriteRecipe
+from app.models.recipe import Recipe
+
+# Отложенная запись счётчика лайков: дельты копятся в памяти и сбрасываются пачкой
+LIKES_WRITE_BEHIND = os.getenv("LIKES_WRITE_BEHIND", "0") == "1"
+LIKES_FLUSH_INTERVAL = float(os.getenv("LIKES_FLUSH_INTERVAL", "1.0"))
+
+logger = logging.getLogger(__name__)
+
+recipes_table = Recipe.__table__
+favorites_table = FavoriteRecipe.__table__
+
+
+class LikesCounter:
+    """
+    Обновляет recipes.likes_count атомарным инкрементом в SQL.
+
+    По умолчанию инкремент выполняется в транзакции запроса, вместе со вставкой
+    или удалением записи избранного. В режиме write-behind дельты по каждому
+    рецепту суммируются в памяти и раз в flush_interval секунд записываются
+    одним executemany, так что популярный рецепт не блокирует строку на каждый лайк.
+    Возможный дрейф после падения процесса исправляет reconcile_likes.
+    """
+
+    def __init__(self, write_behind: bool = LIKES_WRITE_BEHIND, flush_interval: float = LIKES_FLUSH_INTERVAL):
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self._pending: dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def add(self, db: AsyncSession, recipe_id: int, delta: int) -> None:
+        if self.write_behind:
+            self._pending[recipe_id] = self._pending.get(recipe_id, 0) + delta
+            return
+        await db.execute(
+            update(recipes_table)
+            .where(recipes_table.c.id == recipe_id)
+            .values(likes_count=func.coalesce(recipes_table.c.likes_count, 0) + delta)
+        )
+
+    async def flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        # Сортировка по id — одинаковый порядок блокировок во всех воркерах
+        params = [{"recipe_id": rid, "delta": delta} for rid, delta in sorted(pending.items()) if delta]
+        if not params:
+            return
+        try:
+            async with SessionLocal() as db:
+                await db.execute(
+                    update(recipes_table)
+                    .where(recipes_table.c.id == bindparam("recipe_id"))
+                    .values(likes_count=func.coalesce(recipes_table.c.likes_count, 0) + bindparam("delta")),
+                    params,
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Не удалось записать счётчики лайков, дельты будут повторены")
+            for rid, delta in pending.items():
+                self._pending[rid] = self._pending.get(rid, 0) + delta
+            return
+        await cache.invalidate(*(recipe_key(p["recipe_id"]) for p in params))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self.write_behind and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+async def reconcile_likes(db: AsyncSession) -> list[int]:
+    """
+    Пересчитывает likes_count по таблице favorite_recipes.
+
+    Аргументы:
+        db: Сессия
+
+    Возвращает:
+        Идентификаторы рецептов, у которых счётчик был исправлен.
+    """
+    counts = (
+        select(func.count())
+        .where(favorites_table.c.recipe_id == recipes_table.c.id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(recipes_table)
+        .where(func.coalesce(recipes_table.c.likes_count, -1) != counts)
+        .values(likes_count=counts)
+        .returning(recipes_table.c.id)
+    )
+    fixed = list(result.scalars())
+    await db.commit()
+    await cache.invalidate(*(recipe_key(rid) for rid in fixed))
+    return fixed
+
+
+likes_counter = LikesCounter()
+
+
+async def main() -> None:
+    async with SessionLocal() as db:
+        fixed = await reconcile_likes(db)
+    print(f"Исправлено счётчиков лайков: {len(fixed)}")
+
+
+if __name__ == "__main__":
+    # python -m app.likes — разовая сверка счётчиков, например из cron
+    asyncio.run(main())
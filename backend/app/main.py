@@ -1,79 +1,139 @@
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from .api.routes.users import user_router
 from .api.routes.recipes import recipe_router
+from .api.pagination import NEXT_CURSOR_HEADER
+from .cache import cache
+from .api.auth import password_hasher
+from .likes import likes_counter
+from .images import image_processor
+from .static_files import CachedStaticFiles
+from .compression import CompressionMiddleware
+from .storage import UploadSizeLimitMiddleware
+from .database.connection import engine
+from .database.replicas import ReadYourWritesMiddleware, replica_router
+from .database.settings import settings as db_settings
+from .metrics import CONTENT_TYPE, InstrumentedPool, InstrumentedRoute, instrument_engine, registry
+from . import profiler
+from .request_logging import RequestLoggingMiddleware, configure_logging
 import os
 import logging
-app = FastAPI()
+# orjson сериализует списки рецептов в несколько раз быстрее стандартного json
+app = FastAPI(default_response_class=ORJSONResponse)
+app.router.route_class = InstrumentedRoute
+instrument_engine(engine)
 
+# Внутри CORS, чтобы ответ 413 тоже получил CORS-заголовки
+app.add_middleware(UploadSizeLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Или конкретные домены
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, profiler.DB_QUERIES_HEADER, profiler.SERVER_TIMING_HEADER],
 )
+if profiler.SQL_PROFILING:
+    # Внутри сжатия: заголовки профиля добавляются к ответу до того, как он сжимается
+    for profiled_engine in [engine, *replica_router.engines]:
+        profiler.instrument_engine(profiled_engine)
+    app.add_middleware(profiler.SQLProfilerMiddleware)
+if replica_router.replicas:
+    # Чтения идут с реплик: повторная инвалидация не даёт отстающей реплике вернуть в кеш старую версию
+    cache.reinvalidate_after = max(cache.reinvalidate_after, db_settings.replica_max_lag_seconds)
+    if replica_router.read_your_writes_seconds:
+        app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(CompressionMiddleware)
+# Добавляется последним, чтобы быть внешним: время и размер — как их видит клиент
+app.add_middleware(RequestLoggingMiddleware)
 
-logging.basicConfig(
-    level=logging.DEBUG,  # Уровень логирования (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",  # Формат сообщения
-    handlers=[
-        logging.FileHandler("app.log"),  # Запись в файл
-        logging.StreamHandler()  # Вывод в консоль
-    ]
-)
+# Записи уходят в очередь, в файл и консоль их пишет отдельный поток
+log_listener = configure_logging()
 
 logger = logging.getLogger(__name__)  # Создание логгера
 
-async def log_request_response(request: Request, call_next):
-    # Логирование входящего запроса
-    request_body = await request.body()
-    
-    logger.info(
-        f"Request: method={request.method} url={request.url} "
-        f"headers={dict(request.headers)} "
-        f"body={request_body.decode() if request_body else None}"
-    )
-    
-    
-    try:
-        response = await call_next(request)
-    except Exception as e:
-        logger.error(f"Error processing request: {str(e)}", exc_info=True)
-        raise
-    
-    
-    # Логирование исходящего ответа
-    response_body = b""
-    async for chunk in response.body_iterator:
-        response_body += chunk
-    
-    logger.info(
-        f"Response: status_code={response.status_code} "
-        f"headers={dict(response.headers)} "
-        f"body={response_body.decode()} "
-    )
-    
-    return Response(
-        content=response_body,
-        status_code=response.status_code,
-        headers=dict(response.headers),
-        media_type=response.media_type
-    )
-
-#app.middleware("http")(log_request_response)
-
 AVATARS_DIR = "static/avatars"
 IMAGES_DIR = "static/images"
 os.makedirs(AVATARS_DIR, exist_ok=True)
 os.makedirs(IMAGES_DIR, exist_ok=True)
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
 
 app.include_router(user_router, prefix="/user")
 app.include_router(recipe_router, prefix="/recipe")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Счётчики попаданий и промахов кеша рецептов и пользователей.
+    """
+    return cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Метрики в текстовом формате Prometheus: задержки и число выполняющихся
+    запросов по маршрутам, время SQL-запросов, состояние пула, загрузки.
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/auth/stats")
+async def password_hasher_stats():
+    """
+    Глубина очереди и задержка хеширования паролей.
+    """
+    return password_hasher.stats()
+
+
+@app.get("/db/health")
+async def db_pool_health():
+    """
+    Состояние пула соединений БД: занятые и свободные соединения, переполнение,
+    число выдач и таймаутов, среднее и максимальное ожидание соединения.
+    Если настроены реплики — их доступность, пулы и сколько чтений ушло на основную БД.
+    """
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedPool):
+        # DB_DISABLE_POOL: соединениями управляет внешний пул (pgbouncer)
+        health = {"pool": type(pool).__name__}
+    else:
+        health = {"pool": type(pool).__name__, **pool.stats()}
+    if replica_router.replicas:
+        health["read_replicas"] = replica_router.stats()
+    return health
+
+
+@app.on_event("startup")
+async def start_likes_counter():
+    likes_counter.start()
+
+
+@app.on_event("shutdown")
+async def stop_likes_counter():
+    await likes_counter.stop()
+
+
+@app.on_event("shutdown")
+def shutdown_password_hasher():
+    password_hasher.shutdown()
+
+
+@app.on_event("shutdown")
+def shutdown_image_processor():
+    image_processor.shutdown()
+
+
+@app.on_event("shutdown")
+async def dispose_replicas():
+    await replica_router.dispose()
+
+
+@app.on_event("shutdown")
+def stop_log_listener():
+    log_listener.stop()
         
 if __name__ == "app":
     import uvicorn
@@ -0,0 +1,297 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.types import Message, Receive, Scope, Send
+
+# Границы корзин гистограмм в секундах: от долей миллисекунды до 10 с
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024, 2 * 1024 * 1024, 5 * 1024 * 1024)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Метрики хранятся в памяти воркера и меняются только из потока цикла событий
+# (события SQLAlchemy в асинхронном движке тоже выполняются в нём), поэтому без блокировок.
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return self.header() + self.samples()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    """
+    Значение, которое может расти и уменьшаться. Если задан collect, значения
+    берутся из него в момент запроса /metrics (например, состояние пула).
+    """
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        collect: Optional[Callable[[], dict[tuple, float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, labels: tuple = ()) -> None:
+        self._values[labels] = value
+
+    def samples(self) -> list[str]:
+        if self.collect is not None:
+            self._values = self.collect()
+        return super().samples()
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # метки -> [счётчики по корзинам..., счётчик +Inf, сумма]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Запросы, которые обрабатываются сейчас", ("method", "route"),
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Время обработки запроса, включая отправку тела", ("method", "route", "status"),
+))
+db_statement_duration = registry.register(Histogram(
+    "db_statement_duration_seconds", "Время выполнения SQL-запросов", ("operation",),
+))
+db_pool_wait = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Ожидание свободного соединения в пуле",
+))
+upload_bytes = registry.register(Histogram(
+    "upload_bytes", "Размер загруженных файлов", ("kind",), buckets=SIZE_BUCKETS,
+))
+upload_duration = registry.register(Histogram(
+    "upload_duration_seconds", "Время приёма и сохранения загрузки", ("kind",),
+))
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    Маршрут FastAPI, который замеряет свои запросы: число выполняющихся и
+    время до отправки последнего байта ответа (для потоковых ответов тоже).
+    Метка route — шаблон пути (/recipe/{recipe_id}), а не сам путь,
+    чтобы число рядов метрик не росло с числом рецептов.
+    """
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        labels = (scope["method"], self.path_format)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(labels)
+        start = time.perf_counter()
+        try:
+            await super().handle(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec(labels)
+            http_request_duration.observe(time.perf_counter() - start, labels + (status_code,))
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, замеряющий время ожидания свободного соединения.
+    Кроме гистограммы ведёт счётчики для stats(): выдачи, таймауты, ожидание.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_seconds_total += elapsed
+            self.wait_seconds_max = max(self.wait_seconds_max, elapsed)
+            db_pool_wait.observe(elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout_s": self.timeout(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            # Все соединения выданы и открывать новые уже нельзя — следующие запросы ждут
+            "saturated": self.checkedout() >= self.size() + self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": self.wait_seconds_total / self.checkouts * 1000 if self.checkouts else 0.0,
+            "max_wait_ms": self.wait_seconds_max * 1000,
+        }
+
+
+def listen_query_time(engine, name: str, callback: Callable[[str, float], None]) -> None:
+    """
+    Вызывает callback(текст запроса, секунды) после каждого SQL-запроса движка.
+
+    Время начала хранится в контексте выполнения (атрибут _<name>_query_start),
+    а не в соединении: если запрос упал, after_cursor_execute не вызывается,
+    и значение уходит вместе с контекстом, ничего не накапливая.
+
+    Аргументы:
+        engine: AsyncEngine
+        name: Имя подписчика, чтобы у нескольких подписчиков не смешивались времена
+        callback: Обработчик с длительностью запроса
+    """
+    attribute = f"_{name}_query_start"
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            setattr(context, attribute, time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, attribute, None)
+        if start is not None:
+            callback(statement, time.perf_counter() - start)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+def _observe_statement(statement: str, seconds: float) -> None:
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    db_statement_duration.observe(seconds, (operation,))
+
+
+def instrument_engine(engine) -> None:
+    """
+    Подключает сбор метрик SQL-запросов и пула к асинхронному движку.
+
+    Аргументы:
+        engine: AsyncEngine из app.database.connection
+    """
+    listen_query_time(engine, "metrics", _observe_statement)
+
+    pool = engine.sync_engine.pool
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        registry.register(Gauge(
+            "db_pool_connections", "Соединения пула по состоянию", ("state",),
+            collect=lambda: {
+                ("size",): pool.size(),
+                ("checked_out",): pool.checkedout(),
+                ("checked_in",): pool.checkedin(),
+                ("overflow",): pool.overflow(),
+            },
+        ))
@@ -0,0 +1,7 @@
+# Модели ссылаются друг на друга по имени в relationship(), поэтому для
+# настройки мапперов должны быть зарегистрированы все. Импорт любой модели
+# подтягивает этот модуль — так работают и CLI (app.bulk, app.facets), и бенчмарки
+from app.models.user import User
+from app.models.recipe import Recipe
+from app.models.fave import FavoriteRecipe
+from app.models.facet import RecipeFacetCount
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String
+from app.database.connection import Base
+
+class RecipeFacetCount(Base):
+    """
+    Предрассчитанные счётчики рецептов для фильтров: сколько рецептов с каждым
+    тегом, уровнем сложности и диапазоном времени приготовления.
+    Поддерживаются приложением при создании, изменении и удалении рецептов.
+    """
+    __tablename__ = "recipe_facet_counts"
+
+    facet = Column(String(20), primary_key=True)  # "tag", "difficulty", "cooking_time", "total"
+    value = Column(String, primary_key=True)
+    recipes_count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey 
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database.connection import Base
 from sqlalchemy.orm import relationship
@@ -11,4 +11,9 @@ class FavoriteRecipe(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="favorite_recipes")
-    recipe = relationship("Recipe", back_populates="favorited_by")
\ No newline at end of file
+    recipe = relationship("Recipe", back_populates="favorited_by")
+
+    __table_args__ = (
+        # Индекс под keyset-пагинацию избранного пользователя
+        Index("ix_favorite_recipes_user_id_created_at_recipe_id", "user_id", "created_at", "recipe_id"),
+    )
\ No newline at end of file
@@ -1,8 +1,18 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, SmallInteger
+from sqlalchemy import Column, Computed, Integer, String, Text, DateTime, ForeignKey, SmallInteger, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.database.connection import Base
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+
+# Конфигурация полнотекстового поиска и выражение для хранимого tsvector.
+# Заголовок весит больше описания, описание — больше шагов.
+SEARCH_CONFIG = "russian"
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(steps, '')), 'C')"
+)
+
 class Recipe(Base):
     __tablename__ = 'recipes'
     
@@ -14,6 +24,7 @@ class Recipe(Base):
     cooking_time_minutes = Column(Integer, nullable=False)
     difficulty = Column(SmallInteger, nullable=False)
     image = Column(String(255))
+    image_variants = Column(JSONB, nullable=True)  # {"thumb": "/static/images/..._thumb.webp", ...}
     steps = Column(Text)  #Использую markdown
     favorited_by = relationship("FavoriteRecipe", back_populates="recipe")
 
@@ -21,6 +32,21 @@ class Recipe(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     likes_count = Column(Integer, default=0)
+    # Генерируемый столбец: Postgres пересчитывает его сам при insert/update.
+    # deferred — чтобы не тянуть вектор в обычные выборки
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
+
+    __table_args__ = (
+        # Индексы под keyset-пагинацию (created_at DESC, id DESC)
+        Index("ix_recipes_created_at_id", "created_at", "id"),
+        Index("ix_recipes_author_id_created_at_id", "author_id", "created_at", "id"),
+        # GIN-индексы под операторы && (tags) и @> (ingredients) в фильтрах
+        Index("ix_recipes_tags_gin", "tags", postgresql_using="gin"),
+        Index("ix_recipes_ingredients_gin", "ingredients", postgresql_using="gin"),
+        Index("ix_recipes_cooking_time_minutes", "cooking_time_minutes"),
+        Index("ix_recipes_difficulty_cooking_time_minutes", "difficulty", "cooking_time_minutes"),
+        Index("ix_recipes_search_vector_gin", "search_vector", postgresql_using="gin"),
+    )
     
     
     
\ No newline at end of file
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB
 from app.database.connection import Base
 
 class User(Base):
@@ -12,6 +13,7 @@ class User(Base):
     password_hash = Column(String)  # Хеш пароля
     bio = Column(String, nullable=True)
     profile_picture = Column(String, nullable=True) #Путь к изображению в духе "/static/avatars/wseluiho782yh389hniult2h.png"
+    profile_picture_variants = Column(JSONB, nullable=True) #Уменьшенные WebP-копии аватара
     is_active = Column(Boolean, default=True)
     favorite_recipes = relationship("FavoriteRecipe", back_populates="user")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
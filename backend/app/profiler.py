@@ -0,0 +1,112 @@
+import logging
+import os
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import listen_query_time
+
+# Профилирование SQL по запросам. Выключено по умолчанию: без него не
+# подключаются ни обработчики событий, ни middleware, и запросы ничего не платят
+SQL_PROFILING = os.getenv("SQL_PROFILING", "0") == "1"
+# Сколько раз один и тот же запрос (с точностью до параметров) может
+# выполниться за HTTP-запрос, прежде чем это будет похоже на N+1
+SQL_PROFILING_REPEAT_THRESHOLD = int(os.getenv("SQL_PROFILING_REPEAT_THRESHOLD", "5"))
+
+DB_QUERIES_HEADER = "X-DB-Queries"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfile:
+    """
+    SQL-запросы одного HTTP-запроса: количество, суммарное время и
+    сколько раз выполнялся каждый текст запроса.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        # Текст уже параметризован ($1, %(id)s), поэтому он и есть «форма» запроса
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(statement, n) for statement, n in self.statements.most_common() if n > threshold]
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def _record_statement(statement: str, seconds: float) -> None:
+    profile = current_profile.get()
+    if profile is not None:
+        profile.record(statement, seconds)
+
+
+def instrument_engine(engine) -> None:
+    """
+    Подключает обработчики событий профилировщика к асинхронному движку.
+
+    Контекст (current_profile) доходит до них, потому что SQLAlchemy
+    выполняет синхронную часть в greenlet с контекстом вызывающей задачи.
+    """
+    listen_query_time(engine, "profile", _record_statement)
+
+
+class SQLProfilerMiddleware:
+    """
+    Собирает SQL-профиль каждого запроса и отдаёт его в заголовках ответа:
+
+        X-DB-Queries: 7
+        Server-Timing: db;dur=12.41;desc="7 queries"
+
+    Если один и тот же запрос повторился больше repeat_threshold раз,
+    пишет предупреждение о возможном N+1.
+    """
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int = SQL_PROFILING_REPEAT_THRESHOLD) -> None:
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Запросы, выполненные после начала ответа (потоковое тело,
+                # фоновые задачи), в заголовки уже не попадут — только в журнал
+                headers = MutableHeaders(scope=message)
+                headers.append(DB_QUERIES_HEADER, str(profile.count))
+                headers.append(
+                    SERVER_TIMING_HEADER,
+                    f'db;dur={profile.total_seconds * 1000:.2f};desc="{profile.count} queries"',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            for statement, n in profile.repeated(self.repeat_threshold):
+                logger.warning(
+                    "Возможный N+1: запрос выполнен %d раз за %s %s: %s",
+                    n, scope["method"], scope["path"], " ".join(statement.split()),
+                )
+            logger.debug(
+                "SQL: %s %s — %d запросов, %.2f мс",
+                scope["method"], scope["path"], profile.count, profile.total_seconds * 1000,
+            )
@@ -0,0 +1,105 @@
+import logging
+import os
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE", "app.log")
+# Доля успешных запросов, попадающих в журнал (0..1). Ошибки 5xx и медленные
+# запросы пишутся всегда
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+access_logger = logging.getLogger("app.access")
+
+
+def configure_logging(level: str = LOG_LEVEL, log_file: str = LOG_FILE) -> QueueListener:
+    """
+    Настраивает корневой логгер на запись через очередь.
+
+    Обработчики запросов только кладут запись в очередь, а запись в файл
+    и консоль выполняет отдельный поток QueueListener, так что медленный
+    диск не задерживает цикл событий.
+
+    Возвращает:
+        Запущенный QueueListener — его нужно остановить при завершении, чтобы дописать очередь
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.FileHandler(log_file), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+class RequestLoggingMiddleware:
+    """
+    Журнал запросов: метод, путь, статус, время обработки и размер ответа.
+
+    Тела запросов и ответов не читаются и не буферизуются — сообщения ASGI
+    проходят насквозь, считается только длина тела, поэтому потоковые ответы
+    остаются потоковыми. Заголовки (в том числе Authorization) и строка
+    запроса в журнал не попадают.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = ACCESS_LOG_SAMPLE_RATE,
+        slow_ms: float = ACCESS_LOG_SLOW_MS,
+        logger: logging.Logger = access_logger,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.logger = logger
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.logger.isEnabledFor(logging.INFO):
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if status_code >= 500 or duration_ms >= self.slow_ms or random.random() < self.sample_rate:
+                self.logger.log(
+                    logging.ERROR if status_code >= 500 else logging.INFO,
+                    "method=%s path=%s status=%d duration_ms=%.2f bytes=%d",
+                    scope["method"], scope["path"], status_code, duration_ms, size,
+                    extra={
+                        "http": {
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "status": status_code,
+                            "duration_ms": round(duration_ms, 2),
+                            "bytes": size,
+                        }
+                    },
+                )
@@ -0,0 +1,102 @@
+import os
+import re
+from mimetypes import guess_type
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from app.compression import choose_encoding
+
+# Имена загрузок не меняются: <sha256>[_вариант].<ext> или старые <uuid>.<ext>
+IMMUTABLE_NAME = re.compile(
+    r"^(?P<key>[0-9a-f]{64}(?:_[a-z]+)?|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})\.[a-z0-9]+$"
+)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+# Предварительно сжатые копии рядом с файлом, в порядке предпочтения
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+class PathSendFileResponse(FileResponse):
+    """
+    FileResponse, который отдаёт файл через расширение ASGI http.response.pathsend,
+    если сервер его поддерживает: сервер сам отправляет файл (sendfile) без
+    чтения его в Python. Запросы с Range и серверы без расширения
+    обслуживаются обычным FileResponse.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensions = scope.get("extensions") or {}
+        headers = Headers(scope=scope)
+        if (
+            "http.response.pathsend" not in extensions
+            or scope["method"].upper() != "GET"
+            or "range" in headers
+            or self.stat_result is None
+        ):
+            return await super().__call__(scope, receive, send)
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+        if self.background is not None:
+            await self.background()
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    Раздача загруженных файлов с заголовками для браузера и CDN.
+
+    - Для неизменяемых имён: Cache-Control immutable на год и сильный ETag
+      из хеша в имени файла.
+    - Если клиент принимает br/gzip и рядом лежит file.br / file.gz,
+      отдаётся сжатая копия с Content-Encoding.
+    - Range-запросы и If-None-Match обрабатываются FileResponse из Starlette.
+    """
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        media_type = guess_type(full_path)[0] or "text/plain"
+        headers = {}
+
+        path = full_path
+        siblings = {}
+        for candidate, suffix in PRECOMPRESSED:
+            try:
+                siblings[candidate] = (full_path + suffix, os.stat(full_path + suffix))
+            except OSError:
+                continue
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), siblings)
+        if siblings:
+            headers["vary"] = "Accept-Encoding"
+        if encoding is not None:
+            path, stat_result = siblings[encoding]
+            headers["content-encoding"] = encoding
+
+        match = IMMUTABLE_NAME.match(os.path.basename(full_path))
+        if match:
+            headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+            etag = match.group("key") + (f"-{encoding}" if encoding else "")
+            headers["etag"] = f'"{etag}"'
+        else:
+            headers["cache-control"] = DEFAULT_CACHE_CONTROL
+
+        response = PathSendFileResponse(
+            path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
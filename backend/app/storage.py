@@ -0,0 +1,194 @@
+import hashlib
+import os
+import time
+import uuid
+from typing import Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.images import remove_upload, remove_variants
+from app.metrics import upload_bytes, upload_duration
+
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024  # 5MB
+CHUNK_SIZE = 64 * 1024
+ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png"}
+# Запас на границы и заголовки multipart сверх самого файла
+MULTIPART_OVERHEAD = 64 * 1024
+UPLOAD_PATH_PREFIXES = ("/recipe/upload-image/", "/user/upload-avatar/")
+
+
+def upload_extension(file: UploadFile) -> str:
+    """
+    Проверяет расширение загружаемого файла и приводит jpeg к jpg.
+    """
+    file_extension = (file.filename or "").split(".")[-1].lower()
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file type")
+    return "jpg" if file_extension == "jpeg" else file_extension
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Ограничивает размер тела запросов загрузки до того, как Starlette
+    разберёт multipart и сохранит его целиком во временный файл.
+
+    Если Content-Length больше лимита, сразу отвечает 413, не читая тело.
+    Без Content-Length (chunked) считает полученные байты и прерывает
+    чтение с 413, как только лимит превышен.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_body_size: int = MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD,
+        path_prefixes: tuple[str, ...] = UPLOAD_PATH_PREFIXES,
+    ) -> None:
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_prefixes = path_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_size:
+            response = JSONResponse(
+                {"detail": "File too large"}, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # FastAPI пробрасывает HTTPException из разбора тела как есть
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large",
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class StagedUpload:
+    """
+    Загрузка, записанная во временный файл рядом с местом назначения.
+
+    Под своим именем (SHA-256 содержимого) файл появляется только в publish —
+    в той же транзакции, что и ссылка на него, и под блокировкой файла.
+    """
+
+    def __init__(self, directory: str, filename: str, tmp_path: str):
+        self.directory = directory
+        self.filename = filename
+        self.tmp_path = tmp_path
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, self.filename)
+
+    @property
+    def url(self) -> str:
+        return f"/{self.directory}/{self.filename}"
+
+    async def publish(self, db: AsyncSession) -> None:
+        """
+        Кладёт файл на место. Вызывается до commit транзакции, которая записывает
+        ссылку на него: блокировка держится до commit, и discard_if_unused не
+        удалит файл, пока ссылка не видна. Если такой файл уже есть (та же
+        картинка загружена раньше), он атомарно заменяется идентичным — так файл
+        гарантированно существует, даже если его только что удалили как ненужный.
+        """
+        await lock_file(db, self.url)
+        os.replace(self.tmp_path, self.path)
+
+    def discard(self) -> None:
+        if os.path.exists(self.tmp_path):
+            os.unlink(self.tmp_path)
+
+
+async def save_upload(file: UploadFile, directory: str, extension: str) -> StagedUpload:
+    """
+    Потоково сохраняет загрузку во временный файл и считает SHA-256 содержимого.
+
+    Размер проверяется на лету — при превышении MAX_UPLOAD_SIZE запись
+    прерывается. Одинаковые загрузки после publish попадают в один и тот же файл.
+
+    Аргументы:
+        file: Файл полученный из формы
+        directory: Каталог назначения (static/images, static/avatars)
+        extension: Расширение файла
+
+    Возвращает:
+        StagedUpload — его нужно опубликовать (publish) или удалить (discard)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    start = time.perf_counter()
+    tmp_path = os.path.join(directory, f".{uuid.uuid4()}.part")
+    try:
+        async with aiofiles.open(tmp_path, "wb") as buffer:
+            while chunk := await file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_UPLOAD_SIZE:
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
+                digest.update(chunk)
+                await buffer.write(chunk)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    kind = os.path.basename(directory)
+    upload_bytes.observe(size, (kind,))
+    upload_duration.observe(time.perf_counter() - start, (kind,))
+    return StagedUpload(directory, f"{digest.hexdigest()}.{extension}", tmp_path)
+
+
+async def lock_file(db: AsyncSession, url: str) -> None:
+    """
+    Транзакционная advisory-блокировка файла по его пути: одинаковые загрузки
+    делят один файл, и проверка «на файл никто не ссылается» с удалением
+    должна быть атомарной относительно публикации ссылки на него.
+    """
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(url, 0))))
+
+
+async def discard_if_unused(db: AsyncSession, column, url: Optional[str], variants: Optional[dict]) -> None:
+    """
+    Удаляет файл и его варианты, если на них больше не ссылается ни одна запись.
+
+    Проверка и удаление идут под блокировкой файла в отдельной транзакции,
+    поэтому вызывать после commit основных изменений — функция сама её завершает.
+
+    Аргументы:
+        db: Сессия
+        column: Столбец со ссылкой на файл (Recipe.image, User.profile_picture)
+        url: Путь к файлу в духе "/static/images/<sha256>.png"
+        variants: Словарь вариантов изображения
+    """
+    if not url:
+        return
+    try:
+        await lock_file(db, url)
+        if await db.scalar(select(exists().where(column == url))):
+            return
+        remove_upload(url)
+        remove_variants(variants)
+    finally:
+        # Завершение транзакции снимает блокировку
+        await db.commit()
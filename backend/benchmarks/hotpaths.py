@@ -0,0 +1,278 @@
+"""
+Микробенчмарки горячих путей обработки запроса, без сети и без БД.
+
+Замеряется CPU-стоимость того, что выполняется почти в каждом запросе:
+
+    recipe_create_as_form   RecipeCreate.as_form: разбор JSON тегов/ингредиентов и валидация
+    recipe_update_as_form   то же для RecipeUpdate
+    recipe_in_db_100        RecipeInDB.model_validate для 100 ORM-объектов Recipe
+    create_access_token     выпуск JWT
+    jwt_decode              проверка и разбор JWT
+    current_user_cached     разрешение зависимости get_current_active_user через ASGI,
+                            пользователь в кеше (обычный случай)
+    current_user_uncached   то же с промахом кеша: чтение из сессии
+
+Вместо БД — FakeSession в памяти с теми методами, которые вызывает get_current_user.
+Она подставляется на место SessionLocal, а не через dependency_overrides: при любых
+переопределениях FastAPI заново строит дерево зависимостей на каждый запрос, и замер
+показывал бы в основном это, а не рабочий путь.
+
+Результаты сравниваются с сохранённым базовым уровнем (hotpaths_baseline.json рядом
+со скриптом). Сравниваются не абсолютные времена, а отношения к эталонной нагрузке
+(reference — фиксированный цикл на чистом Python), замеренной в том же прогоне:
+так базовый уровень переносим между машинами и меньше зависит от их загрузки.
+Если какой-то замер медленнее базового больше чем на --threshold, скрипт
+завершается с кодом 1. После осознанного изменения базовый уровень перезаписывают
+через --save-baseline.
+
+Запуск из папки backend:
+
+    python -m benchmarks.hotpaths [--min-time 0.2] [--rounds 5] [--threshold 0.25]
+        [--save-baseline] [--json]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import jwt
+from fastapi import Depends, FastAPI
+
+from app.api.auth import (
+    ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, SECRET_KEY, create_access_token, current_user_cache,
+    decoded_users, get_current_active_user,
+)
+from app.database.base_recipe import RecipeCreate, RecipeInDB, RecipeUpdate
+from app.database import connection
+from app.models import Recipe, User
+
+BASELINE_PATH = Path(__file__).with_name("hotpaths_baseline.json")
+DEFAULT_THRESHOLD = 0.25
+REFERENCE = "reference"
+
+WORDS = (
+    "нарезать лук морковь обжарить на среднем огне добавить соль перец "
+    "довести до кипения варить помешивая минут посыпать зеленью подавать горячим"
+).split()
+
+FORM_FIELDS = {
+    "title": "Борщ с фасолью",
+    "description": "Наваристый борщ на говяжьем бульоне",
+    "tags": json.dumps(["Суп", "обед ", "первое блюдо", "суп"], ensure_ascii=False),
+    "ingredients": json.dumps(
+        ["свёкла", "капуста", "Картофель", "морковь", "лук", "фасоль", "говядина", "томатная паста"],
+        ensure_ascii=False,
+    ),
+    "cooking_time_minutes": 120,
+    "difficulty": 3,
+    "steps": "1. Сварить бульон\n2. Обжарить овощи\n3. Соединить и варить 20 минут",
+}
+
+
+def make_orm_recipes(rows: int, seed: int = 42) -> list[Recipe]:
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    return [
+        Recipe(
+            id=i + 1,
+            title=" ".join(rnd.choices(WORDS, k=4)).capitalize(),
+            description=" ".join(rnd.choices(WORDS, k=20)),
+            tags=rnd.sample(["суп", "завтрак", "ужин", "веган", "быстро", "выпечка"], k=3),
+            ingredients=rnd.sample(["лук", "морковь", "картофель", "соль", "яйцо", "мука", "сахар"], k=4),
+            cooking_time_minutes=rnd.randint(5, 180),
+            difficulty=rnd.randint(1, 5),
+            image=f"/static/images/{i:064x}.jpg",
+            image_variants={"thumb": f"/static/images/{i:064x}_thumb.webp"},
+            steps="\n".join(f"{n}. " + " ".join(rnd.choices(WORDS, k=25)) for n in range(1, 8)),
+            author_id=rnd.randint(1, 50),
+            likes_count=rnd.randint(0, 1000),
+            created_at=now,
+        )
+        for i in range(rows)
+    ]
+
+
+class FakeSession:
+    """
+    Сессия в памяти: отдаёт заранее созданного пользователя на get/scalar/merge.
+    """
+
+    def __init__(self, user: User):
+        self.user = user
+
+    async def get(self, model, ident):
+        return self.user if ident == self.user.id else None
+
+    async def scalar(self, statement):
+        return self.user
+
+    async def merge(self, instance, load=True):
+        return instance
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+def make_auth_app(user: User) -> FastAPI:
+    app = FastAPI()
+    session = FakeSession(user)
+    # get_db берёт SessionLocal из модуля при каждом вызове
+    connection.SessionLocal = lambda: session
+
+    @app.get("/user/me/")
+    async def me(current_user: User = Depends(get_current_active_user)):
+        return {"id": current_user.id}
+
+    return app
+
+
+async def measure_asgi(app: FastAPI, token: str, min_time: float, before=None) -> float:
+    """Среднее время одного запроса через ASGI в микросекундах."""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/user/me/", "raw_path": b"/user/me/", "root_path": "", "query_string": b"",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "server": ("testserver", 80), "client": ("127.0.0.1", 1),
+    }
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    async def call():
+        if before is not None:
+            await before()
+        await app(dict(scope), receive, send)
+
+    await call()
+    if statuses[-1] != 200:
+        raise RuntimeError(f"зависимость вернула {statuses[-1]} вместо 200")
+
+    repeat = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            await call()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / repeat * 1e6
+        repeat *= 2
+
+
+def measure(func, min_time: float) -> float:
+    """
+    Среднее время одного вызова в микросекундах.
+
+    Число повторов удваивается, пока серия не займёт не меньше min_time секунд:
+    у дешёвых и дорогих замеров одинаково длинные серии и сравнимый шум.
+    """
+    repeat = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / repeat * 1e6
+        repeat *= 2
+
+
+def reference_workload() -> int:
+    """Эталонная нагрузка: не зависит от кода приложения и библиотек."""
+    total = 0
+    for i in range(1000):
+        total += i * i % 7
+    return total
+
+
+def run(min_time: float, rounds: int) -> dict:
+    recipes = make_orm_recipes(100)
+    user = User(id=1, username="user1", email="user1@example.com", password_hash="x", is_active=True)
+    token = create_access_token(
+        {"sub": user.username, "uid": user.id}, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    app = make_auth_app(user)
+
+    async def drop_cached_user():
+        current_user_cache.backend._data.clear()
+        decoded_users._data.clear()
+
+    benchmarks = {
+        REFERENCE: reference_workload,
+        "recipe_create_as_form": lambda: RecipeCreate.as_form(**FORM_FIELDS, author_id=1),
+        "recipe_update_as_form": lambda: RecipeUpdate.as_form(**FORM_FIELDS),
+        "recipe_in_db_100": lambda: [RecipeInDB.model_validate(r) for r in recipes],
+        "create_access_token": lambda: create_access_token({"sub": user.username, "uid": user.id}),
+        "jwt_decode": lambda: jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]),
+    }
+    best: dict[str, float] = {}
+    for _ in range(rounds):
+        # Раунды чередуют все замеры, берётся лучший — так меньше шума и влияния прогрева
+        for name, func in benchmarks.items():
+            value = measure(func, min_time)
+            best[name] = min(best.get(name, value), value)
+        for name, before in (("current_user_cached", None), ("current_user_uncached", drop_cached_user)):
+            value = asyncio.run(measure_asgi(app, token, min_time, before))
+            best[name] = min(best.get(name, value), value)
+    return best
+
+
+def relative_change(results: dict, baseline: dict) -> dict[str, float]:
+    """
+    Изменение каждого замера относительно базового уровня с поправкой на скорость
+    машины: 0.1 — на 10% медленнее. Замеры, которых нет в базовом уровне, пропускаются.
+    """
+    if REFERENCE not in baseline:
+        return {}
+    speed = results[REFERENCE] / baseline[REFERENCE]
+    return {
+        name: value / (baseline[name] * speed) - 1
+        for name, value in results.items()
+        if name != REFERENCE and name in baseline
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-time", type=float, default=0.2, help="секунд на серию одного замера")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="допустимое замедление, доля")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="записать результаты как базовый уровень")
+    parser.add_argument("--json", action="store_true", help="вывести результат в JSON")
+    args = parser.parse_args()
+
+    results = run(args.min_time, args.rounds)
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({k: round(v, 3) for k, v in results.items()}, indent=2) + "\n")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    changes = relative_change(results, baseline)
+    regressions = [name for name, change in changes.items() if change > args.threshold]
+
+    if args.json:
+        print(json.dumps({
+            "results_us": results, "baseline_us": baseline, "change": changes, "regressions": regressions,
+        }, indent=2))
+    else:
+        print(f"{'':<24}{'мкс':>10}{'база':>10}{'изм.':>9}")
+        for name, value in results.items():
+            change = f"{changes[name] * 100:+8.1f}%" if name in changes else f"{'—':>9}"
+            mark = "  РЕГРЕССИЯ" if name in regressions else ""
+            print(f"{name:<24}{value:>10.2f}{baseline.get(name, 0):>10.2f}{change}{mark}")
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
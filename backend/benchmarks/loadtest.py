@@ -0,0 +1,221 @@
+"""
+Нагрузочный тест API с заданной интенсивностью запросов.
+
+Запросы отправляются по открытой модели: новый запрос стартует по расписанию
+(rate в секунду), не дожидаясь ответов на предыдущие, — так рост задержки
+сервера не маскируется снижением нагрузки. Смесь сценариев задаётся весами:
+
+    list       GET /recipe/ со случайной комбинацией фильтров
+    recipe     GET /recipe/{id}
+    login      POST /user/token
+    favorite   POST и DELETE /user/{id}/favorites/{recipe_id}
+    upload     POST /recipe/upload-image/{id} со случайной картинкой
+
+Результат — JSON с p50/p95/p99, ошибками и пропускной способностью по каждому
+сценарию и коммитом, на котором запускали, чтобы сравнивать прогоны между собой.
+
+Данные готовит benchmarks.seed. Запуск из папки backend при работающем сервере:
+
+    python -m benchmarks.loadtest [--url http://localhost:8000] [--rate 50] [--duration 60]
+        [--mix list=50,recipe=30,login=5,favorite=10,upload=5] [--output result.json]
+"""
+import argparse
+import asyncio
+import io
+import json
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import httpx
+from PIL import Image
+
+from benchmarks.seed import SEED_PASSWORD, TAGS, INGREDIENTS
+
+DEFAULT_MIX = "list=50,recipe=30,login=5,favorite=10,upload=5"
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Перцентиль методом ближайшего ранга, values отсортирован."""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(q / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Session:
+    """Вошедший пользователь: токен, id и его рецепты (для загрузки обложек)."""
+
+    def __init__(self, user_id: int, username: str, token: str, recipe_ids: list[int]):
+        self.user_id = user_id
+        self.username = username
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.recipe_ids = recipe_ids
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, recipe_ids: range, sessions: list[Session], seed: int):
+        self.client = client
+        self.recipe_ids = recipe_ids
+        self.sessions = sessions
+        self.rnd = random.Random(seed)
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    async def timed(self, name: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        elapsed = (time.perf_counter() - start) * 1000
+        self.latencies.setdefault(name, []).append(elapsed)
+        if response is None or response.status_code >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        return response
+
+    def random_filters(self) -> dict:
+        params: dict = {"limit": 10}
+        if self.rnd.random() < 0.5:
+            params["tags"] = self.rnd.sample(TAGS[:10], self.rnd.randint(1, 2))
+        if self.rnd.random() < 0.3:
+            params["max_cooking_time"] = self.rnd.choice([15, 30, 60, 120])
+        if self.rnd.random() < 0.2:
+            params["difficulty"] = self.rnd.randint(1, 5)
+        if self.rnd.random() < 0.2:
+            params["ingredients"] = self.rnd.sample(INGREDIENTS[:15], self.rnd.randint(1, 2))
+        return params
+
+    async def list(self) -> None:
+        await self.timed("list", "GET", "/recipe/", params=self.random_filters())
+
+    async def recipe(self) -> None:
+        await self.timed("recipe", "GET", f"/recipe/{self.rnd.choice(self.recipe_ids)}")
+
+    async def login(self) -> None:
+        session = self.rnd.choice(self.sessions)
+        await self.timed("login", "POST", "/user/token", data={"username": session.username, "password": SEED_PASSWORD})
+
+    async def favorite(self) -> None:
+        session = self.rnd.choice(self.sessions)
+        url = f"/user/{session.user_id}/favorites/{self.rnd.choice(self.recipe_ids)}"
+        # Уже добавленный рецепт вернёт ошибку — это тоже реальная нагрузка, но считаем отдельно
+        response = await self.timed("favorite_add", "POST", url, headers=session.headers)
+        if response is not None and response.status_code < 400:
+            await self.timed("favorite_remove", "DELETE", url, headers=session.headers)
+
+    async def upload(self) -> None:
+        session = self.rnd.choice([s for s in self.sessions if s.recipe_ids] or self.sessions)
+        if not session.recipe_ids:
+            return
+        buffer = io.BytesIO()
+        color = tuple(self.rnd.randrange(256) for _ in range(3))
+        Image.new("RGB", (800, 600), color).save(buffer, "PNG")
+        await self.timed(
+            "upload", "POST", f"/recipe/upload-image/{self.rnd.choice(session.recipe_ids)}",
+            headers=session.headers, files={"file": ("cover.png", buffer.getvalue(), "image/png")},
+        )
+
+    async def run(self, mix: dict[str, int], rate: float, duration: float) -> float:
+        scenarios = [getattr(self, name) for name in mix]
+        weights = list(mix.values())
+        tasks = []
+        start = time.perf_counter()
+        total = int(rate * duration)
+        for i in range(total):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self.rnd.choices(scenarios, weights)[0]()))
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            values.sort()
+            endpoints[name] = {
+                "requests": len(values),
+                "errors": self.errors.get(name, 0),
+                "throughput_rps": len(values) / elapsed,
+                "p50_ms": percentile(values, 50),
+                "p95_ms": percentile(values, 95),
+                "p99_ms": percentile(values, 99),
+                "max_ms": values[-1],
+            }
+        return endpoints
+
+
+async def login_sessions(client: httpx.AsyncClient, first_user: int, count: int) -> list[Session]:
+    sessions = []
+    for user_id in range(first_user, first_user + count):
+        username = f"user{user_id}"
+        response = await client.post("/user/token", data={"username": username, "password": SEED_PASSWORD})
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        created = await client.get(f"/user/{user_id}/recipes", params={"limit": 20})
+        recipe_ids = [recipe["id"] for recipe in created.json()] if created.status_code == 200 else []
+        sessions.append(Session(user_id, username, token, recipe_ids))
+    return sessions
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, weight = part.split("=")
+        if name not in ("list", "recipe", "login", "favorite", "upload"):
+            raise argparse.ArgumentTypeError(f"неизвестный сценарий: {name}")
+        mix[name] = int(weight)
+    return mix
+
+
+async def main_async(args) -> dict:
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        sessions = await login_sessions(client, args.first_user, args.sessions)
+        test = LoadTest(client, range(args.first_recipe, args.first_recipe + args.recipes), sessions, args.seed)
+        elapsed = await test.run(args.mix, args.rate, args.duration)
+    return {
+        "revision": git_revision(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "target_rps": args.rate,
+        "duration_s": elapsed,
+        "mix": args.mix,
+        "endpoints": test.report(elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--rate", type=float, default=50, help="запросов в секунду")
+    parser.add_argument("--duration", type=float, default=60, help="секунд")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--first-user", type=int, default=1, help="id первого пользователя из benchmarks.seed")
+    parser.add_argument("--sessions", type=int, default=20, help="сколько пользователей залогинить")
+    parser.add_argument("--first-recipe", type=int, default=1, help="id первого рецепта из benchmarks.seed")
+    parser.add_argument("--recipes", type=int, default=50000, help="сколько рецептов создал seed")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="записать JSON в файл вместо stdout")
+    args = parser.parse_args()
+
+    result = json.dumps(asyncio.run(main_async(args)), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(result)
+    else:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
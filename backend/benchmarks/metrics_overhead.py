@@ -0,0 +1,111 @@
+"""
+Накладные расходы сбора метрик на один запрос и один SQL-запрос.
+
+Один и тот же пустой эндпоинт вызывается напрямую через ASGI (без сети и
+клиента) с обычным APIRoute и с InstrumentedRoute; разница — стоимость
+метрик запроса. Отдельно замеряется пара обработчиков before/after_cursor_execute.
+
+Запуск из папки backend:
+
+    python -m benchmarks.metrics_overhead [--repeat 20000] [--rounds 5] [--json]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from app.metrics import InstrumentedRoute, _after_cursor_execute, _before_cursor_execute
+
+
+def make_app(route_class) -> FastAPI:
+    app = FastAPI()
+    app.router.route_class = route_class
+
+    @app.get("/recipe/{recipe_id}")
+    async def endpoint(recipe_id: int):
+        return {"id": recipe_id}
+
+    return app
+
+
+async def measure_requests(app: FastAPI, repeat: int) -> float:
+    """Среднее время одного запроса в микросекундах."""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/recipe/1", "raw_path": b"/recipe/1", "root_path": "", "query_string": b"",
+        "headers": [], "server": ("testserver", 80), "client": ("127.0.0.1", 1),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(repeat // 10):  # прогрев
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def measure_statement_hooks(repeat: int) -> float:
+    """Среднее время пары событий SQLAlchemy в микросекундах."""
+
+    class Connection:
+        info: dict = {}
+
+    conn = Connection()
+    statement = "SELECT recipes.id FROM recipes WHERE recipes.id = $1"
+    start = time.perf_counter()
+    for _ in range(repeat):
+        _before_cursor_execute(conn, None, statement, None, None, False)
+        _after_cursor_execute(conn, None, statement, None, None, False)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+async def measure_both(repeat: int, rounds: int) -> tuple[float, float]:
+    # Замеры чередуются, берётся лучший из раундов — так меньше влияют шум и прогрев
+    plain_app, instrumented_app = make_app(APIRoute), make_app(InstrumentedRoute)
+    plain, instrumented = [], []
+    for _ in range(rounds):
+        plain.append(await measure_requests(plain_app, repeat))
+        instrumented.append(await measure_requests(instrumented_app, repeat))
+    return min(plain), min(instrumented)
+
+
+def run(repeat: int, rounds: int) -> dict:
+    plain, instrumented = asyncio.run(measure_both(repeat, rounds))
+    return {
+        "repeat": repeat,
+        "request_plain_us": plain,
+        "request_instrumented_us": instrumented,
+        "request_overhead_us": instrumented - plain,
+        "statement_overhead_us": measure_statement_hooks(repeat),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="вывести результат в JSON")
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.rounds)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Запрос без метрик:       {results['request_plain_us']:8.2f} мкс")
+    print(f"Запрос с метриками:      {results['request_instrumented_us']:8.2f} мкс")
+    print(f"Накладные на запрос:     {results['request_overhead_us']:8.2f} мкс")
+    print(f"Накладные на SQL-запрос: {results['statement_overhead_us']:8.2f} мкс")
+
+
+if __name__ == "__main__":
+    main()
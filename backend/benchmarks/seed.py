@@ -0,0 +1,192 @@
+"""
+Наполнение локальной БД синтетическими данными для нагрузочных тестов.
+
+Пользователи, рецепты и избранное пишутся через COPY (asyncpg
+copy_records_to_table) — это на порядки быстрее построчных INSERT.
+Теги, ингредиенты и популярность рецептов распределены по закону Ципфа:
+немного очень частых значений и длинный хвост редких, как в реальных данных.
+likes_count сразу согласован с избранным, счётчики фильтров пересчитываются в конце.
+
+У всех пользователей пароль SEED_PASSWORD, логины user1, user2, ...
+
+Запуск из папки backend (БД должна быть на последней миграции):
+
+    python -m benchmarks.seed [--users 1000] [--recipes 50000] [--favorites-per-user 20] [--seed 42]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+
+from app.api.auth import get_password_hash
+from app.database.connection import DATABASE_URL, SessionLocal
+from app.facets import rebuild_facets
+
+SEED_PASSWORD = "loadtest-password"
+
+TAGS = [
+    "ужин", "обед", "завтрак", "быстро", "суп", "второе блюдо", "первое блюдо", "салат",
+    "десерт", "выпечка", "вегетарианское", "постное", "напиток", "праздник", "детское",
+    "гриль", "закуска", "соус", "мультиварка", "без глютена", "паста", "рыба", "курица",
+    "говядина", "свинина", "грибы", "каша", "пп", "азиатская кухня", "итальянская кухня",
+]
+INGREDIENTS = [
+    "соль", "лук", "морковь", "чеснок", "масло растительное", "перец чёрный", "яйцо",
+    "картофель", "мука", "сахар", "молоко", "сливочное масло", "помидор", "сметана",
+    "курица", "говядина", "сыр", "рис", "зелень", "лимон", "капуста", "огурец", "грибы",
+    "свинина", "гречка", "творог", "макароны", "фасоль", "перец болгарский", "кабачок",
+    "тыква", "яблоко", "мёд", "корица", "разрыхлитель", "дрожжи", "сливки", "рыба",
+    "креветки", "соевый соус", "имбирь", "кинза", "базилик", "оливки", "шпинат",
+]
+WORDS = (
+    "нарезать лук морковь обжарить на среднем огне добавить соль перец "
+    "довести до кипения варить помешивая минут посыпать зеленью подавать горячим"
+).split()
+
+
+def zipf_weights(n: int, s: float = 1.1) -> list[float]:
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def asyncpg_dsn(url: str) -> str:
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+class Generator:
+    def __init__(self, seed: int):
+        self.rnd = random.Random(seed)
+        self.tag_weights = zipf_weights(len(TAGS))
+        self.ingredient_weights = zipf_weights(len(INGREDIENTS), 0.9)
+        self.now = datetime.now(timezone.utc)
+
+    def distinct(self, values: list[str], weights: list[float], k: int) -> list[str]:
+        chosen: dict[str, None] = {}
+        while len(chosen) < k:
+            chosen[self.rnd.choices(values, weights)[0]] = None
+        return list(chosen)
+
+    def created_at(self) -> datetime:
+        return self.now - timedelta(seconds=self.rnd.randint(0, 365 * 24 * 3600))
+
+    def cooking_time(self) -> int:
+        # Логнормальное: медиана около 35 минут, редкие блюда на несколько часов
+        return max(5, min(600, int(self.rnd.lognormvariate(3.55, 0.6))))
+
+    def steps(self) -> str:
+        return "\n".join(
+            f"{n}. " + " ".join(self.rnd.choices(WORDS, k=self.rnd.randint(10, 30)))
+            for n in range(1, self.rnd.randint(3, 10))
+        )
+
+
+async def next_id(conn: asyncpg.Connection, table: str) -> int:
+    return (await conn.fetchval(f"SELECT coalesce(max(id), 0) FROM {table}")) + 1
+
+
+async def seed(users: int, recipes: int, favorites_per_user: int, seed_value: int) -> dict:
+    gen = Generator(seed_value)
+    password_hash = get_password_hash(SEED_PASSWORD)
+    timings = {}
+
+    conn = await asyncpg.connect(asyncpg_dsn(DATABASE_URL))
+    try:
+        first_user = await next_id(conn, "users")
+        first_recipe = await next_id(conn, "recipes")
+        user_ids = range(first_user, first_user + users)
+        recipe_ids = range(first_recipe, first_recipe + recipes)
+
+        # Избранное генерируется первым, чтобы сразу записать рецептам likes_count
+        popularity = list(itertools.accumulate(zipf_weights(recipes, 0.8)))
+        likes = [0] * recipes
+        favorites = []
+        for user_id in user_ids:
+            picked = set(gen.rnd.choices(range(recipes), cum_weights=popularity, k=favorites_per_user))
+            for index in picked:
+                likes[index] += 1
+                favorites.append((user_id, recipe_ids[index], gen.created_at()))
+
+        async with conn.transaction():
+            start = time.perf_counter()
+            await conn.copy_records_to_table(
+                "users",
+                columns=["id", "username", "email", "password_hash", "bio", "is_active", "created_at"],
+                records=(
+                    (uid, f"user{uid}", f"user{uid}@example.com", password_hash, None, True, gen.created_at())
+                    for uid in user_ids
+                ),
+            )
+            timings["users_s"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await conn.copy_records_to_table(
+                "recipes",
+                columns=[
+                    "id", "title", "description", "tags", "ingredients", "cooking_time_minutes",
+                    "difficulty", "steps", "author_id", "created_at", "likes_count",
+                ],
+                records=(
+                    (
+                        rid,
+                        " ".join(gen.rnd.choices(WORDS, k=3)).capitalize(),
+                        " ".join(gen.rnd.choices(WORDS, k=12)),
+                        gen.distinct(TAGS, gen.tag_weights, gen.rnd.randint(1, 4)),
+                        gen.distinct(INGREDIENTS, gen.ingredient_weights, gen.rnd.randint(3, 10)),
+                        gen.cooking_time(),
+                        gen.rnd.choices(range(1, 6), [25, 35, 25, 10, 5])[0],
+                        gen.steps(),
+                        gen.rnd.choice(user_ids),
+                        gen.created_at(),
+                        likes[index],
+                    )
+                    for index, rid in enumerate(recipe_ids)
+                ),
+            )
+            timings["recipes_s"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await conn.copy_records_to_table(
+                "favorite_recipes", columns=["user_id", "recipe_id", "created_at"], records=favorites,
+            )
+            timings["favorites_s"] = time.perf_counter() - start
+
+            # Явные id не двигают последовательности — выравниваем их
+            for table in ("users", "recipes"):
+                await conn.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+                )
+    finally:
+        await conn.close()
+
+    start = time.perf_counter()
+    async with SessionLocal() as db:
+        await rebuild_facets(db)
+    timings["facets_s"] = time.perf_counter() - start
+
+    return {
+        "users": [first_user, first_user + users - 1],
+        "recipes": [first_recipe, first_recipe + recipes - 1],
+        "favorites": len(favorites),
+        "password": SEED_PASSWORD,
+        "timings": timings,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--recipes", type=int, default=50000)
+    parser.add_argument("--favorites-per-user", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    result = asyncio.run(seed(args.users, args.recipes, args.favorites_per_user, args.seed))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Бенчмарк сериализации и сжатия списка рецептов.
+
+Сравнивает стандартный JSONResponse и ORJSONResponse на странице из 100 рецептов
+с полным markdown в steps, а также размер ответа без сжатия, с gzip и br.
+
+Запуск из папки backend:
+
+    python -m benchmarks.serialization [--rows 100] [--repeat 200] [--json]
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timezone
+
+import brotli
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.compression import BROTLI_QUALITY, GZIP_LEVEL
+from app.database.base_recipe import RecipeInDB
+
+WORDS = (
+    "нарезать лук морковь обжарить на среднем огне добавить соль перец "
+    "довести до кипения варить помешивая минут посыпать зеленью подавать горячим"
+).split()
+
+
+def make_recipes(rows: int, seed: int = 42) -> list[RecipeInDB]:
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    recipes = []
+    for i in range(rows):
+        steps = "\n".join(
+            f"{n}. " + " ".join(rnd.choices(WORDS, k=rnd.randint(15, 40)))
+            for n in range(1, rnd.randint(5, 15))
+        )
+        recipes.append(RecipeInDB(
+            id=i + 1,
+            title=" ".join(rnd.choices(WORDS, k=4)).capitalize(),
+            description=" ".join(rnd.choices(WORDS, k=20)),
+            tags=rnd.sample(["суп", "завтрак", "ужин", "веган", "быстро", "выпечка"], k=3),
+            ingredients=rnd.sample(["лук", "морковь", "картофель", "соль", "яйцо", "мука", "сахар"], k=4),
+            cooking_time_minutes=rnd.randint(5, 180),
+            difficulty=rnd.randint(1, 5),
+            image=f"/static/images/{i:064x}.jpg",
+            image_variants={"thumb": f"/static/images/{i:064x}_thumb.webp"},
+            steps=steps,
+            author_id=rnd.randint(1, 50),
+            likes_count=rnd.randint(0, 1000),
+            created_at=now,
+        ))
+    return recipes
+
+
+def measure(func, repeat: int) -> float:
+    """Среднее время одного вызова в миллисекундах."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(rows: int, repeat: int) -> dict:
+    recipes = make_recipes(rows)
+    adapter = TypeAdapter(list[RecipeInDB])
+    # FastAPI сначала превращает response_model в JSON-совместимые объекты, затем рендерит ответ
+    content = jsonable_encoder(adapter.dump_python(recipes, mode="json"))
+
+    results = {"rows": rows}
+    for name, response_class in (("json", JSONResponse), ("orjson", ORJSONResponse)):
+        body = response_class(content).body
+        results[name] = {
+            "serialize_ms": measure(lambda: response_class(content), repeat),
+            "bytes": len(body),
+        }
+
+    body = ORJSONResponse(content).body
+    results["gzip"] = {
+        "compress_ms": measure(lambda: gzip.compress(body, compresslevel=GZIP_LEVEL), repeat),
+        "bytes": len(gzip.compress(body, compresslevel=GZIP_LEVEL)),
+    }
+    results["br"] = {
+        "compress_ms": measure(lambda: brotli.compress(body, quality=BROTLI_QUALITY), repeat),
+        "bytes": len(brotli.compress(body, quality=BROTLI_QUALITY)),
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="вывести результат в JSON")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Список из {results['rows']} рецептов")
+    print(f"{'':<10}{'время, мс':>12}{'байт':>12}")
+    for name in ("json", "orjson"):
+        print(f"{name:<10}{results[name]['serialize_ms']:>12.3f}{results[name]['bytes']:>12}")
+    for name in ("gzip", "br"):
+        print(f"{name:<10}{results[name]['compress_ms']:>12.3f}{results[name]['bytes']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Общие фикстуры тестов.
+
+Тесты идут без Postgres — на SQLite через aiosqlite. Модели используют типы
+Postgres, поэтому здесь они объявляются для SQLite: ARRAY хранится как JSON-строка,
+JSONB — как JSON, tsvector — как текст, а функции генерируемого столбца
+search_vector заменены заглушками.
+"""
+import asyncio
+import json
+import sqlite3
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from app.database.connection import Base
+from app.models import FavoriteRecipe, Recipe, User
+from app.models.facet import RecipeFacetCount
+
+
+@compiles(ARRAY, "sqlite")
+def _array_sqlite(type_, compiler, **kw):
+    return "ARRAY"
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(TSVECTOR, "sqlite")
+def _tsvector_sqlite(type_, compiler, **kw):
+    return "TEXT"
+
+
+# Списки из столбцов ARRAY пишутся JSON-строкой и читаются обратно по объявленному типу
+sqlite3.register_adapter(list, lambda value: json.dumps(value, ensure_ascii=False))
+sqlite3.register_converter("ARRAY", json.loads)
+
+
+def _register_search_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function("to_tsvector", 2, lambda config, text: text, deterministic=True)
+    dbapi_connection.create_function("setweight", 2, lambda vector, weight: vector, deterministic=True)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+        connect_args={"detect_types": sqlite3.PARSE_DECLTYPES},
+    )
+    event.listen(engine.sync_engine, "connect", _register_search_functions)
+
+    async def create_tables():
+        tables = [User.__table__, Recipe.__table__, FavoriteRecipe.__table__, RecipeFacetCount.__table__]
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=tables)
+
+    asyncio.run(create_tables())
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def session_factory(engine):
+    return async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
@@ -0,0 +1,32 @@
+import asyncio
+
+from app.api import auth
+from app.cache import current_user_key
+from app.models import User
+
+
+def test_cached_user_has_no_password_hash(session_factory):
+    """В кеш пользователей не попадает хеш пароля, а сам пользователь из кеша читается."""
+    token = auth.create_access_token({"sub": "user1", "uid": 1})
+
+    async def scenario():
+        async with session_factory() as db:
+            db.add(User(id=1, username="user1", email="user1@example.com", password_hash="secret-hash"))
+            await db.commit()
+        await auth.invalidate_current_user(1)
+        async with session_factory() as db:
+            await auth.get_current_user(token, db)
+        cached = await auth.current_user_cache.get(current_user_key(1))
+        async with session_factory() as db:
+            user = await auth.get_current_user(token, db)
+            username = user.username
+            # Изменяющие эндпоинты перечитывают пользователя — хеш приходит из БД
+            fresh = await db.get(User, 1, populate_existing=True)
+            return cached, username, fresh.password_hash
+
+    cached, username, password_hash = asyncio.run(scenario())
+
+    assert b"password_hash" not in cached
+    assert b"secret-hash" not in cached
+    assert username == "user1"
+    assert password_hash == "secret-hash"
@@ -0,0 +1,35 @@
+import asyncio
+import json
+
+import pytest
+
+from app.bulk import import_recipes, is_upload_url
+
+RECIPE = {
+    "title": "Суп", "description": "Описание", "tags": ["суп"], "ingredients": ["лук"],
+    "cooking_time_minutes": 30, "difficulty": 2, "steps": "1. Сварить", "author_id": 1,
+}
+
+
+async def chunks_of(*recipes: dict):
+    for recipe in recipes:
+        yield json.dumps(recipe, ensure_ascii=False).encode() + b"\n"
+
+
+@pytest.mark.parametrize(
+    "image",
+    ["/../x", "/static/images/../../x", "/static/images/a/b.png", "/static/avatars/a.png", "/static/images/"],
+)
+def test_import_rejects_image_outside_uploads(session_factory, image):
+    async def run():
+        async with session_factory() as db:
+            return await import_recipes(db, chunks_of({**RECIPE, "image": image}), author_id=1)
+
+    report = asyncio.run(run())
+
+    assert report.inserted == 0
+    assert report.errors == [{"line": 1, "detail": "Invalid image path"}]
+
+
+def test_is_upload_url_accepts_uploaded_images():
+    assert is_upload_url("/static/images/0f1e2d.png")
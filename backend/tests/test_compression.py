@@ -0,0 +1,53 @@
+import gzip
+
+import brotli
+import pytest
+from starlette.testclient import TestClient
+
+from app.compression import choose_encoding
+from app.static_files import CachedStaticFiles
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("gzip;q=0.5, br;q=0.8", "br"),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("GZIP;Q=1", "gzip"),
+        ("*", "br"),
+        ("br;q=0, *;q=0.5", "gzip"),
+        ("identity", None),
+        ("gzip;q=0, br;q=0", None),
+        ("br;q=abc", None),
+        ("brotli, xgzip", None),
+        ("", None),
+    ],
+)
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip, br", "br"),
+        ("br;q=0, gzip", "gzip"),
+        ("gzip;q=0, br;q=0", None),
+        ("brotli, xgzip", None),
+    ],
+)
+def test_static_files_precompressed_encoding(tmp_path, accept_encoding, expected):
+    body = b"console.log(1);"
+    (tmp_path / "app.js").write_bytes(body)
+    (tmp_path / "app.js.br").write_bytes(brotli.compress(body))
+    (tmp_path / "app.js.gz").write_bytes(gzip.compress(body))
+    client = TestClient(CachedStaticFiles(directory=tmp_path))
+
+    response = client.get("/app.js", headers={"Accept-Encoding": accept_encoding})
+
+    assert response.headers.get("content-encoding") == expected
+    assert response.content == body
+    assert response.headers["vary"] == "Accept-Encoding"
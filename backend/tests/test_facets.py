@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import func, select
+
+from app.api.auth import get_current_active_user
+from app.api.filters import apply_recipe_filters
+from app.api.routes import recipes
+from app.database.connection import get_db
+from app.models import Recipe, User
+
+USER = User(id=1, username="user1", email="user1@example.com", password_hash="x")
+
+
+async def sqlite_facet_counts(db, filters, tag_limit):
+    # В SQLite нет unnest() и операторов массивов, поэтому считается только total
+    total = await db.scalar(apply_recipe_filters(select(func.count()).select_from(Recipe), filters))
+    return {"total": total, "tags": {}, "difficulty": {}, "cooking_time": {}}
+
+
+def make_app(session_factory) -> FastAPI:
+    app = FastAPI()
+    app.include_router(recipes.recipe_router, prefix="/recipe")
+
+    async def db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = db
+    app.dependency_overrides[get_current_active_user] = lambda: USER
+    return app
+
+
+def test_filtered_facets_see_new_recipe(session_factory, monkeypatch):
+    """Кешированный ответ с фильтрами сбрасывается при создании рецепта."""
+    monkeypatch.setattr(recipes, "facet_counts", sqlite_facet_counts)
+
+    async def scenario():
+        async with session_factory() as db:
+            db.add(User(id=1, username="user1", email="user1@example.com", password_hash="x"))
+            await db.commit()
+        transport = httpx.ASGITransport(app=make_app(session_factory))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            before = await client.get("/recipe/facets", params={"difficulty": 2})
+            created = await client.post("/recipe/create", data={
+                "title": "Суп", "description": "Описание", "tags": json.dumps(["суп"]), "ingredients": json.dumps(["лук"]),
+                "cooking_time_minutes": 30, "difficulty": 2, "steps": "1. Сварить", "author_id": 1,
+            })
+            after = await client.get("/recipe/facets", params={"difficulty": 2})
+        return before, created, after
+
+    before, created, after = asyncio.run(scenario())
+
+    assert before.json()["total"] == 0
+    assert created.status_code == 201, created.text
+    assert after.json()["total"] == 1
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import profiler
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.routes.recipes import recipe_router
+from app.api.routes.users import user_router
+from app.database.connection import get_db
+from app.database.replicas import get_read_db
+from app.models import FavoriteRecipe, Recipe, User
+
+FAVORITES = 5
+
+
+async def seed(session_factory) -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    async with session_factory() as db:
+        db.add(User(id=1, username="user1", email="user1@example.com", password_hash="x"))
+        for i in range(1, FAVORITES + 1):
+            db.add(Recipe(
+                id=i, title=f"Рецепт {i}", description="Описание", tags=["суп"], ingredients=["лук"],
+                cooking_time_minutes=30, difficulty=2, steps="1. Сварить", image_variants={"thumb": f"/static/images/{i}.webp"},
+                author_id=1, likes_count=0, created_at=start,
+            ))
+        await db.flush()
+        for i in range(1, FAVORITES + 1):
+            db.add(FavoriteRecipe(user_id=1, recipe_id=i, created_at=start + timedelta(minutes=i)))
+        await db.commit()
+
+
+def make_app(session_factory) -> FastAPI:
+    app = FastAPI()
+    app.include_router(user_router, prefix="/user")
+    app.include_router(recipe_router, prefix="/recipe")
+
+    async def read_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_read_db] = read_db
+    app.dependency_overrides[get_db] = read_db
+    return app
+
+
+async def get_profiled(client: httpx.AsyncClient, url: str, **params) -> tuple[httpx.Response, profiler.RequestProfile]:
+    profile = profiler.RequestProfile()
+    token = profiler.current_profile.set(profile)
+    try:
+        # ASGITransport вызывает приложение в той же задаче, контекст профиля до него доходит
+        response = await client.get(url, params=params)
+    finally:
+        profiler.current_profile.reset(token)
+    return response, profile
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/user/1/favorites",
+        "/user/1/recipes",
+        # Без токена: с ним добавляется ещё один запрос статуса избранного
+        # (= ANY(:ids)), которого нет в SQLite
+        "/recipe/",
+    ],
+)
+def test_recipe_list_page_is_single_query(engine, session_factory, url):
+    """Страница списка рецептов — один SQL-запрос, сколько бы рецептов на ней ни было."""
+    profiler.instrument_engine(engine)
+
+    async def scenario():
+        await seed(session_factory)
+        transport = httpx.ASGITransport(app=make_app(session_factory))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first, first_profile = await get_profiled(client, url, limit=3)
+            second, second_profile = await get_profiled(
+                client, url, limit=3, cursor=first.headers[NEXT_CURSOR_HEADER],
+            )
+        return first, first_profile, second, second_profile
+
+    first, first_profile, second, second_profile = asyncio.run(scenario())
+
+    # Избранное — по времени добавления, остальные списки — по (created_at, id)
+    assert first.status_code == 200
+    assert [recipe["id"] for recipe in first.json()] == [5, 4, 3]
+    assert first_profile.count == 1, first_profile.statements
+
+    assert second.status_code == 200
+    assert [recipe["id"] for recipe in second.json()] == [2, 1]
+    assert second_profile.count == 1, second_profile.statements
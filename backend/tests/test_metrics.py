@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.metrics import listen_query_time
+
+
+def test_failed_statement_does_not_skew_next_timing(engine):
+    """Время начала упавшего запроса не остаётся в соединении и не попадает к следующему."""
+    timings = []
+    listen_query_time(engine, "test", lambda statement, seconds: timings.append((statement, seconds)))
+
+    async def scenario():
+        async with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                await conn.execute(text("SELECT * FROM missing_table"))
+            await conn.execute(text("SELECT 1"))
+            return dict(conn.sync_connection.info)
+
+    info = asyncio.run(scenario())
+
+    assert [statement for statement, _ in timings] == ["SELECT 1"]
+    assert info == {}
@@ -0,0 +1,72 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from app.api.pagination import CURSOR_RANK, CURSOR_TIME, decode_cursor, encode_cursor
+from app.api.routes.recipes import recipe_router
+from app.database.connection import get_db
+from app.database.replicas import get_read_db
+
+LIST_CURSOR = encode_cursor(datetime(2025, 1, 1, tzinfo=timezone.utc), 7)
+SEARCH_CURSOR = encode_cursor(0.25, 7)
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(LIST_CURSOR, CURSOR_TIME) == (datetime(2025, 1, 1, tzinfo=timezone.utc), 7)
+    assert decode_cursor(SEARCH_CURSOR, CURSOR_RANK) == (0.25, 7)
+    # Курсоры без вида, выданные до обновления
+    assert decode_cursor(raw_cursor(["2025-01-01T00:00:00+00:00", 7]), CURSOR_TIME)[1] == 7
+    assert decode_cursor(raw_cursor([0.25, 7]), CURSOR_RANK) == (0.25, 7)
+
+
+@pytest.mark.parametrize(
+    ("cursor", "kind"),
+    [
+        (LIST_CURSOR, CURSOR_RANK),
+        (SEARCH_CURSOR, CURSOR_TIME),
+        (raw_cursor(["t", 0.25, 7]), CURSOR_TIME),
+        (raw_cursor(["r", "2025-01-01", 7]), CURSOR_RANK),
+        (raw_cursor(["r", 0.25, "7"]), CURSOR_RANK),
+        (raw_cursor(["r", True, 7]), CURSOR_RANK),
+        (raw_cursor({"key": 0.25}), CURSOR_RANK),
+        ("not a cursor", CURSOR_TIME),
+    ],
+)
+def test_decode_cursor_rejects_wrong_kind_and_types(cursor, kind):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, kind)
+    assert error.value.status_code == 400
+
+
+def test_cursor_from_other_endpoint_is_400(session_factory):
+    """Курсор списка в поиске (и наоборот) — 400, а не 500 на запросе к БД."""
+    app = FastAPI()
+    app.include_router(recipe_router, prefix="/recipe")
+
+    async def db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = db
+    app.dependency_overrides[get_read_db] = db
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            search = await client.get("/recipe/search", params={"q": "суп", "cursor": LIST_CURSOR})
+            listing = await client.get("/recipe/", params={"cursor": SEARCH_CURSOR})
+        return search, listing
+
+    search, listing = asyncio.run(scenario())
+
+    assert search.status_code == 400
+    assert listing.status_code == 400
@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import profiler
+
+
+def test_profile_skips_failed_statement(engine):
+    """Упавший запрос не оставляет в соединении время начала и не сдвигает учёт следующих."""
+    profiler.instrument_engine(engine)
+    profile = profiler.RequestProfile()
+
+    async def scenario():
+        token = profiler.current_profile.set(profile)
+        try:
+            async with engine.connect() as conn:
+                with pytest.raises(OperationalError):
+                    await conn.execute(text("SELECT * FROM missing_table"))
+                await conn.execute(text("SELECT 1"))
+                return dict(conn.sync_connection.info)
+        finally:
+            profiler.current_profile.reset(token)
+
+    info = asyncio.run(scenario())
+
+    assert profile.count == 1
+    assert list(profile.statements) == ["SELECT 1"]
+    assert info == {}
@@ -0,0 +1,77 @@
+import asyncio
+import io
+import os
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+
+from app import storage
+from app.images import IMAGE_VARIANTS, generate_variants, remove_upload, remove_variants
+
+
+@pytest.fixture
+def static_root(tmp_path, monkeypatch):
+    # Пути загрузок относительные (static/...), как при запуске из папки backend
+    backend = tmp_path / "backend"
+    backend.mkdir()
+    monkeypatch.chdir(backend)
+    for directory in ("static/images", "static/avatars"):
+        os.makedirs(directory)
+    return backend
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["/../victim.txt", "/static/images/../../victim.txt", "/static/victim.txt", "/static/images"],
+)
+def test_remove_upload_refuses_paths_outside_upload_dirs(static_root, url):
+    for path in ("../victim.txt", "static/victim.txt"):
+        with open(path, "w") as file:
+            file.write("x")
+
+    remove_upload(url)
+    remove_variants({"thumb": url})
+
+    assert os.path.exists("../victim.txt")
+    assert os.path.exists("static/victim.txt")
+    assert os.path.isdir("static/images")
+
+
+def test_remove_upload_deletes_uploaded_files(static_root):
+    for path in ("static/images/a.png", "static/images/a_thumb.webp", "static/avatars/b.png"):
+        open(path, "w").close()
+
+    remove_upload("/static/images/a.png")
+    remove_upload("/static/avatars/b.png")
+    remove_variants({"thumb": "/static/images/a_thumb.webp"})
+
+    assert os.listdir("static/images") == []
+    assert os.listdir("static/avatars") == []
+
+
+def test_generate_variants_replaces_partial_files(static_root):
+    Image.new("RGB", (1200, 800), "red").save("static/images/a.png")
+    # Недописанный вариант от прерванного процесса
+    with open("static/images/a_thumb.webp", "wb") as file:
+        file.write(b"RIFF")
+
+    variants = generate_variants("static/images/a.png")
+
+    for variant, path in variants.items():
+        with Image.open(path) as image:
+            assert image.format == "WEBP"
+    with Image.open(variants["thumb"]) as thumb:
+        assert max(thumb.size) == IMAGE_VARIANTS["thumb"]
+    assert sorted(os.listdir("static/images")) == sorted(["a.png", *(os.path.basename(p) for p in variants.values())])
+
+
+def test_save_upload_rejects_oversized_file_with_413(static_root, monkeypatch):
+    monkeypatch.setattr(storage, "MAX_UPLOAD_SIZE", 10)
+    upload = UploadFile(io.BytesIO(b"x" * 11), filename="a.png")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(storage.save_upload(upload, "static/images", "png"))
+
+    assert error.value.status_code == 413
+    assert os.listdir("static/images") == []
@@ -41,6 +41,31 @@ export const recipeApi = createApi({
       providesTags: (result, error, arg) => [{ type: 'Recipe', id: arg }],
     }),
 
+    // Несколько рецептов одним запросом: { recipes: [...], missing: [id, ...] }
+    getRecipesBatch: builder.query({
+      query: (recipeIds) => {
+        const params = new URLSearchParams();
+        recipeIds.forEach(id => params.append('ids', id));
+        return `/batch?${params.toString()}`;
+      },
+      providesTags: (result) =>
+        result ? result.recipes.map(({ id }) => ({ type: 'Recipe', id })) : [],
+    }),
+
+    // Счётчики рецептов по тегам, сложности и времени для боковой панели фильтров
+    getRecipeFacets: builder.query({
+      query: ({ tags, maxCookingTime, minCookingTime, difficulty, ingredients } = {}) => {
+        const params = new URLSearchParams();
+        if (tags?.length) tags.forEach(tag => params.append('tags', tag));
+        if (maxCookingTime) params.append('max_cooking_time', maxCookingTime);
+        if (minCookingTime) params.append('min_cooking_time', minCookingTime);
+        if (difficulty) params.append('difficulty', difficulty);
+        if (ingredients?.length) ingredients.forEach(ing => params.append('ingredients', ing));
+        return `/facets?${params.toString()}`;
+      },
+      providesTags: [{ type: 'Recipe', id: 'LIST' }],
+    }),
+
     updateRecipe: builder.mutation({
         query: ({recipeId, recipeData}) => {
           const formData = new FormData();
@@ -83,9 +108,11 @@ export const recipeApi = createApi({
     }),
 
 
+    // Страница списка: { recipes: [...], nextCursor }. nextCursor берётся из заголовка
+    // X-Next-Cursor и передаётся как cursor за следующей страницей; null — страниц больше нет
     getRecipes: builder.query({
       query: ({ 
-        skip = 0, 
+        cursor = null, 
         limit = 10, 
         tags, 
         maxCookingTime, 
@@ -95,8 +122,8 @@ export const recipeApi = createApi({
       } = {}) => {
         const params = new URLSearchParams();
         
-        // Обязательные параметры пагинации
-        params.append('skip', skip);
+        // Пагинация по курсору: без него — первая страница
+        if (cursor) params.append('cursor', cursor);
         params.append('limit', limit);
         
         // Опциональные параметры фильтрации
@@ -108,10 +135,14 @@ export const recipeApi = createApi({
         
         return `/?${params.toString()}`;
       },
+      transformResponse: (recipes, meta) => ({
+        recipes,
+        nextCursor: meta?.response?.headers.get('X-Next-Cursor') ?? null,
+      }),
       providesTags: (result) =>
         result
           ? [
-              ...result.map(({ id }) => ({ type: 'Recipe', id })),
+              ...result.recipes.map(({ id }) => ({ type: 'Recipe', id })),
               { type: 'Recipe', id: 'LIST' },
             ]
           : [{ type: 'Recipe', id: 'LIST' }],
@@ -122,6 +153,8 @@ export const recipeApi = createApi({
 export const {
   useCreateRecipeMutation,
   useGetRecipeQuery,
+  useGetRecipesBatchQuery,
+  useGetRecipeFacetsQuery,
   useUpdateRecipeMutation,
   useUploadRecipeImageMutation,
   useDeleteRecipeMutation,
@@ -129,6 +129,15 @@ export const userApi = createApi({
   
   getIsInUserFavorites: builder.query({
     query: ({userId, recipeId}) => `/${userId}/favorited/${recipeId}`
+    }),
+
+  // Какие из рецептов страницы в избранном — одним запросом
+  getFavoritedRecipeIds: builder.query({
+    query: ({userId, recipeIds}) => {
+      const params = new URLSearchParams();
+      recipeIds.forEach(id => params.append('ids', id));
+      return `/${userId}/favorited?${params.toString()}`;
+    },
     })
 
   })
@@ -146,6 +155,7 @@ export const {
   useAddToUserFavoritesMutation,
   useGetCreatedRecipesQuery,
   useGetFavoriteRecipesQuery,
-  useGetIsInUserFavoritesQuery
+  useGetIsInUserFavoritesQuery,
+  useGetFavoritedRecipeIdsQuery
 } = userApi;
 
@@ -13,7 +13,9 @@ import '../../components/header/Header.css'
 import {FilterSidebar} from '../../components/FilterSidebar/FilterSidebar';
 
 function Home() {
-  const [skip, setSkip] = useState(0);
+  // Курсор загружаемой страницы (null — первая) и курсор следующей из ответа
+  const [cursor, setCursor] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
   const limit = 10; // Количество рецептов за один запрос
   const [recipes, setRecipes] = useState([]);
   const [hasMore, setHasMore] = useState(true);
@@ -54,12 +56,13 @@ function Home() {
     setFilterParams(newFilterParams);
     // Сбрасываем пагинацию при изменении фильтров
     setRecipes([]);
-    setSkip(0);
+    setCursor(null);
+    setNextCursor(null);
     setHasMore(true);
   };
   // Получаем данные с учетом фильтров
   const { data, isLoading, isFetching, refetch } = useGetRecipesQuery({ 
-    skip, 
+    cursor, 
     limit,
     tags: filterParams.tags,
     minCookingTime: filterParams.minCookingTime,
@@ -87,26 +90,30 @@ function Home() {
   };
   useEffect(() => {
     setRecipes([]);
-    setSkip(0);
+    setCursor(null);
+    setNextCursor(null);
     setHasMore(true);
   }, []);
   // Объединяем новые рецепты с уже загруженными
   useEffect(() => {
     if (data) {
-      setRecipes(prev => [...prev, ...data]);
-      // Если пришло меньше рецептов, чем запрошено, значит это конец
-      if (data.length < limit) {
-        setHasMore(false);
-      }
+      // is_favorited приходит в списке, если запрос сделан с токеном
+      setRecipes(prev => [
+        ...prev,
+        ...data.recipes.map(recipe => ({ ...recipe, isFavorite: recipe.is_favorited ?? recipe.isFavorite }))
+      ]);
+      // Сервер не прислал курсор следующей страницы — значит это конец
+      setNextCursor(data.nextCursor);
+      setHasMore(data.nextCursor != null);
     }
-  }, [data, limit]);
+  }, [data]);
   
   // Наблюдатель для бесконечного скролла
   useEffect(() => {
     const observer = new IntersectionObserver(
       (entries) => {
-        if (entries[0].isIntersecting && hasMore && !isFetching) {
-          setSkip(prev => prev + limit);
+        if (entries[0].isIntersecting && hasMore && !isFetching && nextCursor) {
+          setCursor(nextCursor);
         }
       },
       { threshold: 0.1 }
@@ -121,7 +128,7 @@ function Home() {
         observer.unobserve(loaderRef.current);
       }
     };
-  }, [hasMore, isFetching, limit]);
+  }, [hasMore, isFetching, nextCursor]);
   
   const getImageUrl = (imagePath) => {
     if (!imagePath) return '/src/assets/recipeSpaceIco.svg';
@@ -162,7 +169,7 @@ function Home() {
       >
         <div className="recipe-image">
           <img 
-            src={getImageUrl(recipe.image)} 
+            src={getImageUrl(recipe.image_variants?.thumb || recipe.image)} 
             alt={recipe.title} 
             onError={(e) => {
               e.target.src = '/src/assets/recipeSpaceIco.svg';
@@ -207,7 +214,8 @@ function RecipeFavoriteButton({ recipe, currentUser, updateRecipeFavoriteStatus
   
   const { data: isFavoriteData, refetch: refetchIsFavorite } = useGetIsInUserFavoritesQuery(
     { userId: currentUser?.id, recipeId: recipe?.id },
-    { skip: !currentUser || !recipe }
+    // Отдельный запрос нужен, только если статус не пришёл вместе со списком
+    { skip: !currentUser || !recipe || recipe.is_favorited != null }
   );
 
   useEffect(() => {
@@ -235,7 +243,7 @@ function RecipeFavoriteButton({ recipe, currentUser, updateRecipeFavoriteStatus
         }).unwrap();
         updateRecipeFavoriteStatus(recipe.id, true, 1);
       }
-      await refetchIsFavorite();
+      if (recipe.is_favorited == null) await refetchIsFavorite();
     } catch (error) {
       console.error('Ошибка при обновлении избранного:', error);
     }
@@ -276,7 +276,7 @@ function UserProfile() {
                 >
                   <div className="recipe-image">
                     <img 
-                      src={getImageUrl(recipe.image)} 
+                      src={getImageUrl(recipe.image_variants?.thumb || recipe.image)} 
                       alt={recipe.title} 
                       onError={(e) => {
                         e.target.src = '/src/assets/recipeSpaceIco.svg';
@@ -315,7 +315,7 @@ function UserProfile() {
                 >
                   <div className="recipe-image">
                     <img 
-                      src={getImageUrl(recipe.image)} 
+                      src={getImageUrl(recipe.image_variants?.thumb || recipe.image)} 
                       alt={recipe.title} 
                       onError={(e) => {
                         e.target.src = '/src/assets/recipeSpaceIco.svg';